@@ -14,10 +14,46 @@ class Settings(BaseSettings):
     # ── ElevenLabs Speech-to-Text (Scribe API) ───────────────────────────
     elevenlabs_api_key: str = ""
     elevenlabs_stt_model: str = "scribe_v2"
+    # Retries for 429/5xx/connection errors (jittered backoff, honours Retry-After)
+    elevenlabs_max_retries: int = 3
+    # WAVs longer than this are split and chunks transcribed concurrently (0 = never)
+    elevenlabs_chunk_seconds: int = 600
+    elevenlabs_max_concurrency: int = 4
+    elevenlabs_chunk_overlap_seconds: float = 1.0
+
+    # Codec for STT uploads: flac (lossless, ~2x smaller) | opus (~8x) | wav
+    stt_upload_codec: str = "flac"
+
+    # ── OpenAI Whisper (alternative STT backend) ─────────────────────────
+    openai_api_key: str = ""
+    whisper_model: str = "whisper-1"
+    # Encoded chunk size per request; the API rejects anything over 25 MB.
+    whisper_chunk_bytes: int = 23 * 1024 * 1024
+    whisper_max_concurrency: int = 4
+    # Retries per chunk for 429/5xx/connection errors (jittered backoff)
+    whisper_max_retries: int = 3
+    # Audio repeated at the start of each chunk, in case a cut lands mid-word.
+    whisper_chunk_overlap_seconds: float = 1.0
 
     # ── Google Gemini (body language analysis) ──────────────────────────
     gemini_api_key: str = ""
     gemini_model: str = "gemini-3.1-pro-preview"
+    # Concurrent segment requests per model; adapts (AIMD) on 429s up to the max.
+    gemini_initial_concurrency: int = 2
+    gemini_max_concurrency: int = 6
+    # Plan body-language segments from a local motion pass: merge still
+    # stretches, split busy ones (see app/services/video_activity.py).
+    body_language_adaptive_segments: bool = False
+    # Segments per Gemini request; >1 switches to batched JSON output.
+    gemini_batch_windows: int = 1
+    # Default body-language input: "video" (File API upload) or "keyframes"
+    # (frames sampled locally at this rate/width, sent inline).
+    gemini_input_mode: str = "video"
+    gemini_keyframe_fps: float = 0.5
+    gemini_keyframe_width: int = 384
+    # Inline frame bytes (base64) per request; Gemini rejects requests over
+    # 20 MB, so longer windows are sent at a lower effective frame rate.
+    gemini_keyframe_max_bytes: int = 15 * 1024 * 1024
 
     # ── Minimax LLM (teacher feedback via Anthropic SDK) ─────────────
     minimax_api_key: str = ""
@@ -30,6 +66,34 @@ class Settings(BaseSettings):
     # Max video file size accepted (bytes).  Default = 500 MB.
     max_upload_bytes: int = 500 * 1024 * 1024
 
+    # ── Result cache (content-addressed by media SHA-256) ───────────────
+    # Empty dir → <temp_dir>/hte_result_cache.  Set max bytes to 0 to disable.
+    result_cache_dir: str = ""
+    result_cache_max_bytes: int = 256 * 1024 * 1024
+
+    # ── Result store (SQLite) ───────────────────────────────────────────
+    # Empty → <temp_dir>/hte_results.sqlite3
+    result_store_path: str = ""
+
+    # ── Workspaces (per-request scratch dirs) ───────────────────────────
+    # Empty dir → <temp_dir>/hte_workspaces.  Quota 0 disables back-pressure.
+    workspace_dir: str = ""
+    workspace_quota_bytes: int = 10 * 1024 * 1024 * 1024
+    # How long a request waits for room under the quota before a 503.
+    workspace_wait_seconds: int = 30
+    # Abandoned workspaces (no live owner) older than this are deleted.
+    workspace_max_age_seconds: int = 6 * 60 * 60
+    workspace_janitor_interval_seconds: int = 10 * 60
+
+    # ── Background jobs ─────────────────────────────────────────────────
+    max_concurrent_jobs: int = 2
+    max_queued_jobs: int = 20
+    # Threads for blocking stage work (ffmpeg, yt-dlp) of running jobs;
+    # provider calls are async and do not use them.
+    job_stage_threads: int = 8
+    # Finished jobs stay queryable this long.
+    job_retention_seconds: int = 6 * 60 * 60
+
 
 @lru_cache
 def get_settings() -> Settings:
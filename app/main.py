@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -9,15 +10,33 @@ from app.routes.analyze import router as analyze_router
 from app.routes.dashboard import router as dashboard_router
 from app.routes.feedback import router as feedback_router
 from app.routes.full_analysis import router as full_analysis_router
+from app.routes.jobs import router as jobs_router
+from app.routes.results import router as results_router
+from app.services.http_client import close_async_http_client
+from app.services.job_manager import get_job_manager
+from app.services.workspace import get_workspace_manager
 
 STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
 
 
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    job_manager = get_job_manager()
+    workspace_manager = get_workspace_manager()
+    await job_manager.start()
+    await workspace_manager.start()
+    yield
+    await workspace_manager.stop()
+    await job_manager.stop()
+    await close_async_http_client()
+
+
 def create_app() -> FastAPI:
     application = FastAPI(
         title="Teacher Performance Dashboard API",
         version="0.1.0",
         description="Analyse classroom video recordings — transcription, body language, and rubric evaluation.",
+        lifespan=lifespan,
     )
 
     application.add_middleware(
@@ -31,6 +50,8 @@ def create_app() -> FastAPI:
     application.include_router(dashboard_router)
     application.include_router(analyze_router)
     application.include_router(full_analysis_router)
+    application.include_router(jobs_router)
+    application.include_router(results_router)
     application.include_router(feedback_router)
 
     if STATIC_DIR.is_dir():
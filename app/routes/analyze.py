@@ -15,9 +15,8 @@ Legacy endpoint kept for backward compat:
   POST /api/v1/analyze-teaching
 """
 import asyncio
+import hashlib
 import logging
-import os
-import shutil
 import uuid
 from pathlib import Path
 
@@ -28,22 +27,41 @@ from app.schemas.response import (
     AnalysisResponse,
     BodyLanguageRequest,
     BodyLanguageResponse,
+    BodyLanguageResumeRequest,
     FluctuationWindow,
     SegmentResult,
     TranscriptResult,
     TranscriptSegment,
     YouTubeRequest,
 )
-from app.services.audio_utils import extract_audio
+from app.services.audio_utils import (
+    STREAMABLE_AUDIO_EXTENSIONS,
+    extract_audio,
+    extract_audio_from_stream,
+)
 from app.services.gemini_evaluation import evaluate_with_gemini
 from app.services.gemini_body_language import (
+    BodyLanguageReport,
     analyze_body_language,
     download_youtube_video,
+    find_uploaded_video,
     get_video_duration,
+    resolve_input_mode,
     upload_video_to_gemini,
 )
+from app.services.analysis_pipeline import build_body_language_summary
+from app.services.pcm_audio import PcmAudio
+from app.services.result_cache import file_hash, get_result_cache, make_key
+from app.services.result_store import get_result_store
 from app.services.session_stats import stats as session_stats
+from app.services.upload_utils import UploadTooLargeError, iter_upload, save_upload
+from app.services.workspace import (
+    DOWNLOAD_RESERVE_BYTES,
+    WorkspaceQuotaError,
+    get_workspace_manager,
+)
 from app.services.elevenlabs_transcribe import ElevenLabsTranscribeService
+from app.services.video_activity import plan_adaptive_segments
 from app.services.voice_analysis import calculate_fluctuation_timeline
 from app.services.youtube_service import YouTubeDownloader, is_valid_youtube_url
 
@@ -75,6 +93,31 @@ def _build_response(ws_result, job_id: str) -> TranscriptResult:
     )
 
 
+def _body_language_response(
+    job_id: str, video_source: str, report: BodyLanguageReport,
+) -> BodyLanguageResponse:
+    """Segment overview; the report itself is at ``/api/results/{job_id}``."""
+    return BodyLanguageResponse(
+        job_id=job_id,
+        video_source=video_source,
+        model=report.model,
+        total_segments=len(report.segments),
+        segments=[SegmentResult(**seg.info()) for seg in report.segments],
+        result_url=f"/api/results/{job_id}",
+    )
+
+
+def _parse_ts(ts: str) -> int:
+    minutes, seconds = ts.split(":")
+    return int(minutes) * 60 + int(seconds)
+
+
+def _store_result(
+    job_id: str, kind: str, payload, video_source: str, media_hash: str | None = None,
+) -> None:
+    get_result_store().save(job_id, kind, payload, video_source=video_source, media_hash=media_hash)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  POST /api/analyze  — file upload
 # ─────────────────────────────────────────────────────────────────────────────
@@ -97,46 +140,73 @@ async def analyze_file(
         )
 
     job_id = uuid.uuid4().hex
-    tmp_dir = Path(settings.temp_dir) / f"vt_{job_id}"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        workspace = await get_workspace_manager().acquire("vt", job_id, settings.max_upload_bytes)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    tmp_dir = workspace.path
 
     raw_path = str(tmp_dir / f"input{ext}")
     wav_path = str(tmp_dir / "audio.wav")
 
     try:
-        # ── Save upload ────────────────────────────────────────────────────
-        contents = await file.read()
-        if len(contents) > settings.max_upload_bytes:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File exceeds the {settings.max_upload_bytes // (1024*1024)} MB limit.",
+        loop = asyncio.get_running_loop()
+        digest = hashlib.sha256()
+        try:
+            if ext in STREAMABLE_AUDIO_EXTENSIONS:
+                # ── Audio upload: pipe straight into ffmpeg, no raw copy ───
+                await extract_audio_from_stream(
+                    iter_upload(file, settings.max_upload_bytes, digest=digest), wav_path,
+                )
+                logger.info("[%s] Streamed upload into ffmpeg: %s", job_id, filename)
+            else:
+                # ── Save upload; audio is extracted after the cache check ──
+                size = await save_upload(
+                    file, raw_path, settings.max_upload_bytes, digest=digest,
+                )
+                logger.info("[%s] Saved upload: %s (%.1f MB)", job_id, filename, size / 1e6)
+        except UploadTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        workspace.settle()
+
+        # ── Result cache ───────────────────────────────────────────────────
+        cache = get_result_cache()
+        cache_key = make_key(
+            digest.hexdigest(), "transcript",
+            language=language, model=settings.elevenlabs_stt_model,
+            codec=settings.stt_upload_codec,
+        )
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            logger.info("[%s] Transcript served from cache", job_id)
+            result = TranscriptResult(job_id=job_id, **cached)
+            await loop.run_in_executor(
+                None, _store_result, job_id, "transcript", result, filename, digest.hexdigest(),
             )
-        Path(raw_path).write_bytes(contents)
-        logger.info("[%s] Saved upload: %s (%.1f MB)", job_id, filename, len(contents) / 1e6)
+            session_stats.transcriptions += 1
+            return result
 
-        # ── Extract audio (if video) ───────────────────────────────────────
-        if ext in {".wav", ".mp3", ".m4a", ".ogg", ".flac"}:
-            # Already audio — still normalize to 16kHz mono WAV
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, extract_audio, raw_path, wav_path)
-        else:
-            loop = asyncio.get_running_loop()
+        if ext not in STREAMABLE_AUDIO_EXTENSIONS:
             await loop.run_in_executor(None, extract_audio, raw_path, wav_path)
-
         logger.info("[%s] Audio extracted → %s", job_id, wav_path)
 
         # ── Transcribe (ElevenLabs Scribe) ────────────────────────────────
         if not settings.elevenlabs_api_key:
             raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
-        svc = ElevenLabsTranscribeService(settings.elevenlabs_api_key, settings.elevenlabs_stt_model)
-        loop = asyncio.get_running_loop()
-        ws_result = await loop.run_in_executor(None, svc.transcribe, wav_path, language)
+        svc = ElevenLabsTranscribeService.from_settings(settings)
+        ws_result = await svc.transcribe_async(wav_path, language)
 
         logger.info("[%s] Transcription done: %d segments, lang=%s",
                     job_id, len(ws_result.segments), ws_result.language)
 
+        result = _build_response(ws_result, job_id)
+        if cache:
+            cache.put(cache_key, result.model_dump(exclude={"job_id"}))
+        await loop.run_in_executor(
+            None, _store_result, job_id, "transcript", result, filename, digest.hexdigest(),
+        )
         session_stats.transcriptions += 1
-        return _build_response(ws_result, job_id)
+        return result
 
     except HTTPException:
         raise
@@ -146,11 +216,7 @@ async def analyze_file(
         logger.error("[%s] Runtime error: %s", job_id, exc)
         raise HTTPException(status_code=500, detail=str(exc))
     finally:
-        # ── Cleanup ───────────────────────────────────────────────────────
-        try:
-            shutil.rmtree(tmp_dir, ignore_errors=True)
-        except Exception:
-            pass
+        workspace.release()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -165,7 +231,10 @@ async def analyze_youtube(body: YouTubeRequest) -> TranscriptResult:
         raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
 
     job_id = uuid.uuid4().hex
-    tmp_dir: Path | None = None
+    try:
+        workspace = await get_workspace_manager().acquire("yt", job_id, DOWNLOAD_RESERVE_BYTES)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
 
     try:
         downloader = YouTubeDownloader(settings)
@@ -173,22 +242,23 @@ async def analyze_youtube(body: YouTubeRequest) -> TranscriptResult:
         # yt-dlp is blocking — run in executor
         loop = asyncio.get_running_loop()
         wav_path = await loop.run_in_executor(
-            None, downloader.download_audio, body.url, job_id
+            None, downloader.download_audio, body.url, job_id, str(workspace.path)
         )
-        tmp_dir = Path(wav_path).parent
 
         logger.info("[%s] YouTube audio ready: %s", job_id, wav_path)
 
         if not settings.elevenlabs_api_key:
             raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
-        svc = ElevenLabsTranscribeService(settings.elevenlabs_api_key, settings.elevenlabs_stt_model)
-        ws_result = await loop.run_in_executor(None, svc.transcribe, wav_path, body.language)
+        svc = ElevenLabsTranscribeService.from_settings(settings)
+        ws_result = await svc.transcribe_async(wav_path, body.language)
 
         logger.info("[%s] Transcription done: %d segments, lang=%s",
                     job_id, len(ws_result.segments), ws_result.language)
 
+        result = _build_response(ws_result, job_id)
+        await loop.run_in_executor(None, _store_result, job_id, "transcript", result, body.url)
         session_stats.transcriptions += 1
-        return _build_response(ws_result, job_id)
+        return result
 
     except HTTPException:
         raise
@@ -198,11 +268,7 @@ async def analyze_youtube(body: YouTubeRequest) -> TranscriptResult:
         logger.error("[%s] Runtime error: %s", job_id, exc)
         raise HTTPException(status_code=502, detail=str(exc))
     finally:
-        if tmp_dir and tmp_dir.exists():
-            try:
-                shutil.rmtree(tmp_dir, ignore_errors=True)
-            except Exception:
-                pass
+        workspace.release()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -213,12 +279,17 @@ async def body_language_file(
     file: UploadFile,
     model: str = "gemini-3.1-pro-preview",
     segment_duration: int = 180,
+    input_mode: str | None = None,
 ) -> BodyLanguageResponse:
     """Upload a video file and get a segmented body language analysis via Gemini."""
     settings = get_settings()
     api_key = settings.gemini_api_key
     if not api_key:
         raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured.")
+    try:
+        input_mode = resolve_input_mode(input_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
     filename = file.filename or "upload"
     ext = Path(filename).suffix.lower()
@@ -226,46 +297,49 @@ async def body_language_file(
         raise HTTPException(status_code=400, detail=f"Unsupported video type '{ext}'.")
 
     job_id = uuid.uuid4().hex
-    tmp_dir = Path(settings.temp_dir) / f"bl_{job_id}"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    output_dir = str(tmp_dir / "results")
+    try:
+        workspace = await get_workspace_manager().acquire("bl", job_id, settings.max_upload_bytes)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    tmp_dir = workspace.path
 
     raw_path = str(tmp_dir / f"input{ext}")
 
     try:
-        contents = await file.read()
-        if len(contents) > settings.max_upload_bytes:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File exceeds the {settings.max_upload_bytes // (1024*1024)} MB limit.",
-            )
-        Path(raw_path).write_bytes(contents)
-        logger.info("[%s] Saved upload: %s (%.1f MB)", job_id, filename, len(contents) / 1e6)
+        try:
+            digest = hashlib.sha256()
+            size = await save_upload(file, raw_path, settings.max_upload_bytes, digest=digest)
+        except UploadTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        logger.info("[%s] Saved upload: %s (%.1f MB)", job_id, filename, size / 1e6)
+        workspace.settle()
 
         loop = asyncio.get_running_loop()
 
-        file_uri = await loop.run_in_executor(
-            None, upload_video_to_gemini, api_key, raw_path
-        )
+        file_uri = None
+        if input_mode == "video":
+            file_uri = await upload_video_to_gemini(api_key, raw_path, digest.hexdigest())
 
         duration = await loop.run_in_executor(None, get_video_duration, raw_path)
         logger.info("[%s] Video duration: %ds", job_id, duration)
+        spans = None
+        if settings.body_language_adaptive_segments:
+            spans = await loop.run_in_executor(
+                None, plan_adaptive_segments, raw_path, duration, segment_duration,
+            )
 
-        results = await loop.run_in_executor(
-            None,
-            analyze_body_language,
-            api_key, model, file_uri, duration, output_dir, segment_duration,
+        report = await analyze_body_language(
+            api_key, model, file_uri, duration, None, segment_duration,
+            media_hash=digest.hexdigest(), spans=spans,
+            keyframe_video=raw_path if input_mode == "keyframes" else None,
         )
-
-        return BodyLanguageResponse(
-            job_id=job_id,
-            video_source=filename,
-            model=model,
-            total_segments=len(results),
-            segments=[SegmentResult(**r) for r in results],
-            combined_report_path=f"{output_dir}/00_full_body_language_report.md",
+        summary = build_body_language_summary(report)
+        await loop.run_in_executor(
+            None, _store_result, job_id, "body-language", summary, filename, digest.hexdigest(),
         )
 
+        return _body_language_response(job_id, filename, report)
+
     except HTTPException:
         raise
     except ValueError as exc:
@@ -273,6 +347,8 @@ async def body_language_file(
     except RuntimeError as exc:
         logger.error("[%s] Runtime error: %s", job_id, exc)
         raise HTTPException(status_code=500, detail=str(exc))
+    finally:
+        workspace.release()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -288,12 +364,18 @@ async def body_language_youtube(body: BodyLanguageRequest) -> BodyLanguageRespon
 
     if not is_valid_youtube_url(body.url):
         raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+    try:
+        input_mode = resolve_input_mode(body.input_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
     model = body.model or settings.gemini_model
     job_id = uuid.uuid4().hex
-    tmp_dir = Path(settings.temp_dir) / f"blyt_{job_id}"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    output_dir = str(tmp_dir / "results")
+    try:
+        workspace = await get_workspace_manager().acquire("blyt", job_id, DOWNLOAD_RESERVE_BYTES)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    tmp_dir = workspace.path
 
     try:
         loop = asyncio.get_running_loop()
@@ -303,28 +385,31 @@ async def body_language_youtube(body: BodyLanguageRequest) -> BodyLanguageRespon
         )
         logger.info("[%s] YouTube video downloaded: %s", job_id, video_path)
 
-        file_uri = await loop.run_in_executor(
-            None, upload_video_to_gemini, api_key, video_path
-        )
+        media_hash = await loop.run_in_executor(None, file_hash, video_path)
+        file_uri = None
+        if input_mode == "video":
+            file_uri = await upload_video_to_gemini(api_key, video_path, media_hash)
 
         duration = await loop.run_in_executor(None, get_video_duration, video_path)
         logger.info("[%s] Video duration: %ds", job_id, duration)
+        spans = None
+        if settings.body_language_adaptive_segments:
+            spans = await loop.run_in_executor(
+                None, plan_adaptive_segments, video_path, duration, body.segment_duration,
+            )
 
-        results = await loop.run_in_executor(
-            None,
-            analyze_body_language,
-            api_key, model, file_uri, duration, output_dir, body.segment_duration,
+        report = await analyze_body_language(
+            api_key, model, file_uri, duration, None, body.segment_duration,
+            media_hash=media_hash, spans=spans,
+            keyframe_video=video_path if input_mode == "keyframes" else None,
         )
-
-        return BodyLanguageResponse(
-            job_id=job_id,
-            video_source=body.url,
-            model=model,
-            total_segments=len(results),
-            segments=[SegmentResult(**r) for r in results],
-            combined_report_path=f"{output_dir}/00_full_body_language_report.md",
+        summary = build_body_language_summary(report)
+        await loop.run_in_executor(
+            None, _store_result, job_id, "body-language", summary, body.url, media_hash,
         )
 
+        return _body_language_response(job_id, body.url, report)
+
     except HTTPException:
         raise
     except ValueError as exc:
@@ -332,6 +417,88 @@ async def body_language_youtube(body: BodyLanguageRequest) -> BodyLanguageRespon
     except RuntimeError as exc:
         logger.error("[%s] Runtime error: %s", job_id, exc)
         raise HTTPException(status_code=502, detail=str(exc))
+    finally:
+        workspace.release()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  POST /api/body-language/{job_id}/resume  — re-run failed/missing segments
+# ─────────────────────────────────────────────────────────────────────────────
+@router.post("/api/body-language/{job_id}/resume", response_model=BodyLanguageResponse)
+async def body_language_resume(
+    job_id: str, body: BodyLanguageResumeRequest,
+) -> BodyLanguageResponse:
+    """Resume the body-language analysis of a stored result.
+
+    Works from the stored body-language (or full-analysis) result of
+    *job_id* and the video's still-live Gemini upload, so keyframe-mode
+    runs (which upload nothing) cannot be resumed.  Segments already
+    checkpointed are reused and only failed or missing ones are sent to
+    Gemini.  The new result is stored under a new job_id.
+    """
+    settings = get_settings()
+    api_key = body.gemini_api_key or settings.gemini_api_key
+    if not api_key:
+        raise HTTPException(status_code=500, detail="GEMINI_API_KEY not configured.")
+
+    stored = await asyncio.to_thread(get_result_store().get, job_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Result not found.")
+    payload = stored.payload or {}
+    summary = payload if stored.kind == "body-language" else payload.get("body_language")
+    if not summary or not summary.get("segments") or payload.get("is_placeholder"):
+        raise HTTPException(status_code=409, detail="Result has no body-language analysis.")
+    if not stored.media_hash:
+        raise HTTPException(
+            status_code=409,
+            detail="Video of this result is unknown; submit it again to resume.",
+        )
+    if summary.get("input_mode") == "keyframes":
+        # Frames are sampled from the local video, which is gone after the run.
+        raise HTTPException(
+            status_code=409,
+            detail="Keyframe runs cannot be resumed; submit the video again with "
+                   "input_mode=keyframes — finished segments are reused if the "
+                   "keyframe settings are unchanged.",
+        )
+
+    stored_segments = summary["segments"]
+    duration = _parse_ts(stored_segments[-1]["end"])
+    # Same ranges as the stored run (which may be adaptive) unless overridden.
+    spans = None
+    segment_duration = body.segment_duration
+    if segment_duration is None:
+        spans = [(_parse_ts(s["start"]), _parse_ts(s["end"])) for s in stored_segments]
+        segment_duration = spans[0][1] - spans[0][0]
+    if segment_duration <= 0:
+        raise HTTPException(status_code=400, detail="segment_duration must be positive.")
+    model = summary["model"]
+
+    file_uri = await find_uploaded_video(api_key, stored.media_hash)
+    if file_uri is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Gemini upload of this video has expired; submit it again to resume.",
+        )
+
+    new_job_id = uuid.uuid4().hex
+    try:
+        logger.info("[%s] Resuming body language of %s", new_job_id, job_id)
+        report = await analyze_body_language(
+            api_key, model, file_uri, duration, None, segment_duration,
+            media_hash=stored.media_hash, spans=spans,
+        )
+        summary = build_body_language_summary(report)
+        await asyncio.to_thread(
+            _store_result, new_job_id, "body-language", summary,
+            stored.video_source, stored.media_hash,
+        )
+
+        return _body_language_response(new_job_id, stored.video_source or "", report)
+
+    except RuntimeError as exc:
+        logger.error("[%s] Runtime error: %s", new_job_id, exc)
+        raise HTTPException(status_code=502, detail=str(exc))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -347,15 +514,21 @@ async def analyze_teaching(file: UploadFile) -> AnalysisResponse:
         raise HTTPException(status_code=400, detail="Only .mp4 files are accepted.")
 
     job_id = uuid.uuid4().hex
-    temp_dir = Path(settings.temp_dir) / f"hte_{job_id}"
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        workspace = await get_workspace_manager().acquire("hte", job_id, settings.max_upload_bytes)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    temp_dir = workspace.path
 
     mp4_path = str(temp_dir / f"{job_id}.mp4")
     wav_path = str(temp_dir / f"{job_id}.wav")
 
     try:
-        contents = await file.read()
-        Path(mp4_path).write_bytes(contents)
+        try:
+            await save_upload(file, mp4_path, settings.max_upload_bytes)
+        except UploadTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        workspace.settle()
 
         try:
             extract_audio(mp4_path, wav_path)
@@ -366,12 +539,15 @@ async def analyze_teaching(file: UploadFile) -> AnalysisResponse:
         if not settings.elevenlabs_api_key:
             raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
 
-        transcribe_svc = ElevenLabsTranscribeService(settings.elevenlabs_api_key, settings.elevenlabs_stt_model)
-        transcript_future = loop.run_in_executor(None, transcribe_svc.transcribe, wav_path, "auto")
+        # Decode once; transcription and voice analysis share this buffer.
+        audio = await loop.run_in_executor(None, PcmAudio.from_wav, wav_path)
+
+        transcribe_svc = ElevenLabsTranscribeService.from_settings(settings)
+        transcript_future = transcribe_svc.transcribe_async(audio, "auto")
         analysis_future = loop.run_in_executor(
             None,
             calculate_fluctuation_timeline,
-            wav_path,
+            audio,
             settings.fluctuation_window_seconds,
         )
 
@@ -395,12 +571,4 @@ async def analyze_teaching(file: UploadFile) -> AnalysisResponse:
         )
 
     finally:
-        for p in (wav_path, mp4_path):
-            try:
-                os.remove(p)
-            except OSError:
-                pass
-        try:
-            temp_dir.rmdir()
-        except OSError:
-            pass
+        workspace.release()
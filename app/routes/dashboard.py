@@ -10,8 +10,10 @@ from app.config import get_settings
 from app.schemas.response import (
     DashboardResponse,
     DashboardStats,
+    ProviderCallStats,
     ServiceStatus,
 )
+from app.services.http_client import all_provider_metrics
 from app.services.session_stats import stats as session_stats
 
 APP_VERSION = "0.2.0"
@@ -19,26 +21,34 @@ APP_VERSION = "0.2.0"
 router = APIRouter(tags=["dashboard"])
 
 
+def _call_stats(calls: dict, name: str) -> ProviderCallStats | None:
+    return ProviderCallStats(**calls[name]) if name in calls else None
+
+
 @router.get("/api/dashboard", response_model=DashboardResponse)
 def get_dashboard() -> DashboardResponse:
     """Return system health, service availability, and session statistics."""
     settings = get_settings()
+    calls = all_provider_metrics()
 
     services = [
         ServiceStatus(
             name="elevenlabs",
             configured=bool(settings.elevenlabs_api_key),
             label="ElevenLabs Speech-to-Text",
+            calls=_call_stats(calls, "elevenlabs"),
         ),
         ServiceStatus(
             name="gemini",
             configured=bool(settings.gemini_api_key),
             label="Google Gemini (Body Language)",
+            calls=_call_stats(calls, "gemini"),
         ),
         ServiceStatus(
             name="minimax",
             configured=bool(settings.minimax_api_key),
             label="Minimax LLM (AI Feedback)",
+            calls=_call_stats(calls, "minimax"),
         ),
     ]
 
@@ -60,6 +70,13 @@ def get_dashboard() -> DashboardResponse:
             full_analyses=session_stats.full_analyses,
             feedback_generated=session_stats.feedback_generated,
             uptime_seconds=session_stats.uptime_seconds,
+            gemini_processing_waits=session_stats.gemini_processing_waits,
+            gemini_processing_wait_avg_seconds=round(
+                session_stats.gemini_processing_wait_avg_seconds, 1,
+            ),
+            gemini_processing_wait_max_seconds=round(
+                session_stats.gemini_processing_wait_max_seconds, 1,
+            ),
         ),
         capabilities=capabilities,
     )
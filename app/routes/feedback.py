@@ -4,7 +4,6 @@ and returns actionable, personalized feedback.
 
   POST /api/feedback
 """
-import asyncio
 import logging
 
 from fastapi import APIRouter, HTTPException
@@ -43,10 +42,7 @@ async def generate_feedback(body: FeedbackRequest) -> FeedbackResponse:
 
     try:
         svc = MinimaxFeedbackService(settings)
-        loop = asyncio.get_running_loop()
-        feedback = await loop.run_in_executor(
-            None,
-            svc.generate_feedback,
+        feedback = await svc.generate_feedback_async(
             body.transcript,
             body.body_language_report,
             body.rubric_evaluation,
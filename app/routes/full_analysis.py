@@ -8,41 +8,38 @@ and rubric evaluation into a single pipeline.
 Both endpoints accept a `use_placeholder` flag (default True).  When True,
 the pre-analyzed "Mark John" data is returned immediately.  When False, the
 full Gemini pipeline runs: transcription → body language → rubric evaluation.
+Stage outputs for uploaded files are cached by media SHA-256, so a repeat
+upload of the same recording skips the external providers.
+
+These endpoints hold the connection open for the whole pipeline; long
+lessons should go through the job API in ``app/routes/jobs.py`` instead.
 """
-import asyncio
 import logging
-import shutil
 import uuid
 from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, UploadFile
 
 from app.config import get_settings
-from app.schemas.response import (
-    BodyLanguageSegmentReport,
-    BodyLanguageSummary,
-    FullAnalysisRequest,
-    FullAnalysisResponse,
-    SegmentResult,
-    TranscriptResult,
-    TranscriptSegment,
-)
-from app.services.audio_utils import extract_audio
-from app.services.gemini_body_language import (
-    analyze_body_language,
-    download_youtube_video,
-    get_video_duration,
-    upload_video_to_gemini,
+from app.schemas.response import FullAnalysisRequest, FullAnalysisResponse
+from app.services.analysis_pipeline import (
+    UPLOAD_STAGES,
+    YOUTUBE_STAGES,
+    AnalysisOptions,
+    fetch_youtube_media,
+    ingest_upload,
+    placeholder_response,
+    run_full_analysis,
 )
-from app.services.gemini_evaluation import evaluate_with_gemini
-from app.services.placeholder_data import (
-    PLACEHOLDER_RUBRIC_EVALUATION,
-    PLACEHOLDER_VIDEO_SOURCE,
-    load_placeholder_body_language,
+from app.services.gemini_body_language import resolve_input_mode
+from app.services.job_manager import Job
+from app.services.upload_utils import UploadTooLargeError
+from app.services.workspace import (
+    DOWNLOAD_RESERVE_BYTES,
+    WorkspaceQuotaError,
+    get_workspace_manager,
 )
-from app.services.session_stats import stats as session_stats
-from app.services.elevenlabs_transcribe import ElevenLabsTranscribeService
-from app.services.youtube_service import YouTubeDownloader, is_valid_youtube_url
+from app.services.youtube_service import is_valid_youtube_url
 
 logger = logging.getLogger(__name__)
 
@@ -53,50 +50,6 @@ ALLOWED_EXTENSIONS = {
     ".mp3", ".wav", ".m4a", ".webm", ".ogg", ".flac",
 }
 
-VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm"}
-
-
-def _build_transcript_result(ws_result, job_id: str) -> TranscriptResult:
-    segments = [
-        TranscriptSegment(start=s.start, end=s.end, text=s.text)
-        for s in ws_result.segments
-    ]
-    return TranscriptResult(
-        job_id=job_id,
-        language=ws_result.language,
-        duration=round(ws_result.duration, 2),
-        full_text=ws_result.full_text,
-        segments=segments,
-        srt_content=ws_result.srt_content,
-    )
-
-
-def _build_body_language_summary(
-    results: list[dict], model: str, output_dir: str,
-) -> BodyLanguageSummary:
-    combined_path = Path(output_dir) / "00_full_body_language_report.md"
-    combined_report = (
-        combined_path.read_text(encoding="utf-8")
-        if combined_path.exists()
-        else ""
-    )
-    segments = []
-    for r in results:
-        seg_path = Path(output_dir) / r["file"]
-        markdown = seg_path.read_text(encoding="utf-8") if seg_path.exists() else ""
-        segments.append(BodyLanguageSegmentReport(
-            segment=r["segment"],
-            start=r["start"],
-            end=r["end"],
-            markdown=markdown,
-        ))
-    return BodyLanguageSummary(
-        model=model,
-        total_segments=len(segments),
-        segments=segments,
-        combined_report=combined_report,
-    )
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  POST /api/full-analysis  — file upload
@@ -108,6 +61,7 @@ async def full_analysis_file(
     language: str = "auto",
     model: str = "gemini-3.1-pro-preview",
     segment_duration: int = 180,
+    input_mode: str | None = None,
 ) -> FullAnalysisResponse:
     """Upload a video/audio file and get the full analysis pipeline.
 
@@ -119,21 +73,9 @@ async def full_analysis_file(
     job_id = uuid.uuid4().hex
 
     if use_placeholder:
-        body_language = load_placeholder_body_language()
-        session_stats.full_analyses += 1
-        return FullAnalysisResponse(
-            job_id=job_id,
-            video_source=file.filename or "upload",
-            is_placeholder=True,
-            transcript=None,
-            body_language=body_language,
-            rubric_evaluation=PLACEHOLDER_RUBRIC_EVALUATION,
-        )
+        return placeholder_response(job_id, file.filename or "upload")
 
     # ── Live analysis pipeline ────────────────────────────────────────────
-    api_key = settings.gemini_api_key
-    use_gemini = bool(api_key)
-
     filename = file.filename or "upload"
     ext = Path(filename).suffix.lower()
     if ext not in ALLOWED_EXTENSIONS:
@@ -142,77 +84,34 @@ async def full_analysis_file(
             detail=f"Unsupported file type '{ext}'. "
                    f"Accepted: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
         )
-
-    tmp_dir = Path(settings.temp_dir) / f"fa_{job_id}"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    output_dir = str(tmp_dir / "results")
-
-    raw_path = str(tmp_dir / f"input{ext}")
-    wav_path = str(tmp_dir / "audio.wav")
-
+    if not settings.elevenlabs_api_key:
+        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
     try:
-        contents = await file.read()
-        if len(contents) > settings.max_upload_bytes:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File exceeds the {settings.max_upload_bytes // (1024 * 1024)} MB limit.",
-            )
-        Path(raw_path).write_bytes(contents)
-        logger.info("[%s] Saved upload: %s (%.1f MB)", job_id, filename, len(contents) / 1e6)
-
-        loop = asyncio.get_running_loop()
-
-        # Step 1: Extract audio + transcribe
-        await loop.run_in_executor(None, extract_audio, raw_path, wav_path)
-        logger.info("[%s] Audio extracted", job_id)
-
-        if not settings.elevenlabs_api_key:
-            raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
-        svc = ElevenLabsTranscribeService(settings.elevenlabs_api_key, settings.elevenlabs_stt_model)
-        ws_result = await loop.run_in_executor(None, svc.transcribe, wav_path, language)
-        transcript_result = _build_transcript_result(ws_result, job_id)
-        logger.info("[%s] Transcription done: %d segments", job_id, len(ws_result.segments))
+        input_mode = resolve_input_mode(input_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-        # Step 2: Body language analysis (only for video files)
-        body_language: BodyLanguageSummary | None = None
-        if ext in VIDEO_EXTENSIONS:
-            if use_gemini:
-                file_uri = await loop.run_in_executor(
-                    None, upload_video_to_gemini, api_key, raw_path,
-                )
-                duration = await loop.run_in_executor(None, get_video_duration, raw_path)
-                bl_results = await loop.run_in_executor(
-                    None,
-                    analyze_body_language,
-                    api_key, model, file_uri, duration, output_dir, segment_duration,
-                )
-                body_language = _build_body_language_summary(bl_results, model, output_dir)
-                logger.info("[%s] Body language analysis done: %d segments", job_id, len(bl_results))
-            else:
-                body_language = load_placeholder_body_language()
-                logger.info("[%s] Body language: using fallback from body_language_analysis/", job_id)
+    try:
+        workspace = await get_workspace_manager().acquire("fa", job_id, settings.max_upload_bytes)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
 
-        # Step 3: Rubric evaluation (Gemini or fallback)
-        bl_report = body_language.combined_report if body_language else None
-        if use_gemini:
-            rubric_evaluation = await loop.run_in_executor(
-                None,
-                evaluate_with_gemini,
-                api_key, model, ws_result.full_text, bl_report,
-            )
-            logger.info("[%s] Rubric evaluation done", job_id)
-        else:
-            rubric_evaluation = PLACEHOLDER_RUBRIC_EVALUATION
-            logger.info("[%s] Rubric: using fallback from body_language_analysis/", job_id)
-        session_stats.full_analyses += 1
-        return FullAnalysisResponse(
-            job_id=job_id,
-            video_source=filename,
-            is_placeholder=False,
-            transcript=transcript_result,
-            body_language=body_language,
-            rubric_evaluation=rubric_evaluation,
+    try:
+        try:
+            media = await ingest_upload(file, job_id, str(workspace), settings.max_upload_bytes)
+        except UploadTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        workspace.settle()
+
+        options = AnalysisOptions(
+            language=language,
+            model=model,
+            segment_duration=segment_duration,
+            input_mode=input_mode,
+            gemini_api_key=settings.gemini_api_key,
         )
+        job = Job.create(job_id, "full-analysis", UPLOAD_STAGES)
+        return await run_full_analysis(media, options, job)
 
     except HTTPException:
         raise
@@ -222,10 +121,7 @@ async def full_analysis_file(
         logger.error("[%s] Runtime error: %s", job_id, exc)
         raise HTTPException(status_code=500, detail=str(exc))
     finally:
-        try:
-            shutil.rmtree(tmp_dir, ignore_errors=True)
-        except Exception:
-            pass
+        workspace.release()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -242,92 +138,34 @@ async def full_analysis_youtube(body: FullAnalysisRequest) -> FullAnalysisRespon
     job_id = uuid.uuid4().hex
 
     if body.use_placeholder:
-        body_language = load_placeholder_body_language()
-        session_stats.full_analyses += 1
-        return FullAnalysisResponse(
-            job_id=job_id,
-            video_source=body.url,
-            is_placeholder=True,
-            transcript=None,
-            body_language=body_language,
-            rubric_evaluation=PLACEHOLDER_RUBRIC_EVALUATION,
-        )
+        return placeholder_response(job_id, body.url)
 
     # ── Live analysis pipeline ────────────────────────────────────────────
-    api_key = body.gemini_api_key or settings.gemini_api_key
-    use_gemini = bool(api_key)
-
     if not is_valid_youtube_url(body.url):
         raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
-
-    model = body.model or settings.gemini_model
-    tmp_dir = Path(settings.temp_dir) / f"fayt_{job_id}"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    output_dir = str(tmp_dir / "results")
-
+    if not settings.elevenlabs_api_key:
+        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
     try:
-        loop = asyncio.get_running_loop()
-
-        # Download video for body language analysis
-        video_path = await loop.run_in_executor(
-            None, download_youtube_video, body.url, str(tmp_dir),
-        )
-        logger.info("[%s] YouTube video downloaded: %s", job_id, video_path)
-
-        # Download audio for transcription
-        downloader = YouTubeDownloader(settings)
-        wav_path = await loop.run_in_executor(
-            None, downloader.download_audio, body.url, job_id,
-        )
-        logger.info("[%s] YouTube audio ready: %s", job_id, wav_path)
-
-        # Step 1: Transcribe
-        if not settings.elevenlabs_api_key:
-            raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
-        svc = ElevenLabsTranscribeService(settings.elevenlabs_api_key, settings.elevenlabs_stt_model)
-        ws_result = await loop.run_in_executor(
-            None, svc.transcribe, wav_path, body.language,
-        )
-        transcript_result = _build_transcript_result(ws_result, job_id)
-        logger.info("[%s] Transcription done: %d segments", job_id, len(ws_result.segments))
+        input_mode = resolve_input_mode(body.input_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-        # Step 2: Body language analysis
-        if use_gemini:
-            file_uri = await loop.run_in_executor(
-                None, upload_video_to_gemini, api_key, video_path,
-            )
-            duration = await loop.run_in_executor(None, get_video_duration, video_path)
-            bl_results = await loop.run_in_executor(
-                None,
-                analyze_body_language,
-                api_key, model, file_uri, duration, output_dir, body.segment_duration,
-            )
-            body_language = _build_body_language_summary(bl_results, model, output_dir)
-            logger.info("[%s] Body language analysis done: %d segments", job_id, len(bl_results))
-        else:
-            body_language = load_placeholder_body_language()
-            logger.info("[%s] Body language: using fallback from body_language_analysis/", job_id)
+    try:
+        workspace = await get_workspace_manager().acquire("fayt", job_id, DOWNLOAD_RESERVE_BYTES)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
 
-        # Step 3: Rubric evaluation (Gemini or fallback)
-        if use_gemini:
-            rubric_evaluation = await loop.run_in_executor(
-                None,
-                evaluate_with_gemini,
-                api_key, model, ws_result.full_text, body_language.combined_report,
-            )
-            logger.info("[%s] Rubric evaluation done", job_id)
-        else:
-            rubric_evaluation = PLACEHOLDER_RUBRIC_EVALUATION
-            logger.info("[%s] Rubric: using fallback from body_language_analysis/", job_id)
-        session_stats.full_analyses += 1
-        return FullAnalysisResponse(
-            job_id=job_id,
-            video_source=body.url,
-            is_placeholder=False,
-            transcript=transcript_result,
-            body_language=body_language,
-            rubric_evaluation=rubric_evaluation,
+    try:
+        options = AnalysisOptions(
+            language=body.language,
+            model=body.model or settings.gemini_model,
+            segment_duration=body.segment_duration,
+            input_mode=input_mode,
+            gemini_api_key=body.gemini_api_key or settings.gemini_api_key,
         )
+        job = Job.create(job_id, "full-analysis-youtube", YOUTUBE_STAGES)
+        media = await fetch_youtube_media(body.url, job, str(workspace))
+        return await run_full_analysis(media, options, job)
 
     except HTTPException:
         raise
@@ -337,13 +175,4 @@ async def full_analysis_youtube(body: FullAnalysisRequest) -> FullAnalysisRespon
         logger.error("[%s] Runtime error: %s", job_id, exc)
         raise HTTPException(status_code=502, detail=str(exc))
     finally:
-        try:
-            shutil.rmtree(tmp_dir, ignore_errors=True)
-        except Exception:
-            pass
-        audio_dir = Path(settings.temp_dir) / f"yt_{job_id}"
-        if audio_dir.exists():
-            try:
-                shutil.rmtree(audio_dir, ignore_errors=True)
-            except Exception:
-                pass
+        workspace.release()
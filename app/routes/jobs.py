@@ -0,0 +1,309 @@
+"""
+Asynchronous job endpoints for long-running analyses.
+
+  POST /api/jobs/full-analysis          — file upload, returns a job_id
+  POST /api/jobs/full-analysis/youtube  — YouTube URL, returns a job_id
+  GET  /api/jobs/{job_id}               — status, per-stage progress, result
+  GET  /api/jobs/{job_id}/events        — Server-Sent Events progress stream
+
+The upload itself is ingested in the request (so the client learns about
+oversized or unsupported files immediately); the pipeline then runs on the
+bounded worker pool in ``app/services/job_manager.py``.
+
+The event stream replays everything that already happened, then pushes
+``stage_started`` / ``stage_finished`` (with the stage output as
+``partial``) / ``stage_skipped`` / ``stage_failed``, ``segment_finished``
+for each body-language segment, and finally ``completed``.  Reconnecting
+clients send ``Last-Event-ID`` to resume where they left off.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from pathlib import Path
+
+from fastapi import APIRouter, Header, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.schemas.response import (
+    FullAnalysisRequest,
+    JobStage,
+    JobStatusResponse,
+    JobSubmitResponse,
+)
+from app.services.analysis_pipeline import (
+    UPLOAD_STAGES,
+    YOUTUBE_STAGES,
+    AnalysisOptions,
+    fetch_youtube_media,
+    ingest_upload,
+    placeholder_response,
+    run_full_analysis,
+)
+from app.services.gemini_body_language import resolve_input_mode
+from app.services.job_manager import Job, JobQueueFullError, get_job_manager
+from app.services.result_store import get_result_store
+from app.services.upload_utils import UploadTooLargeError
+from app.services.workspace import (
+    DOWNLOAD_RESERVE_BYTES,
+    WorkspaceQuotaError,
+    get_workspace_manager,
+)
+from app.services.youtube_service import is_valid_youtube_url
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["jobs"])
+
+# Comment lines keep idle proxies/load balancers from closing the stream.
+SSE_KEEPALIVE_SECONDS = 15
+
+ALLOWED_EXTENSIONS = {
+    ".mp4", ".mov", ".mkv", ".avi",
+    ".mp3", ".wav", ".m4a", ".webm", ".ogg", ".flac",
+}
+
+
+def _submit_response(job: Job) -> JobSubmitResponse:
+    return JobSubmitResponse(
+        job_id=job.job_id,
+        status=job.status,
+        status_url=f"/api/jobs/{job.job_id}",
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  POST /api/jobs/full-analysis  — file upload
+# ─────────────────────────────────────────────────────────────────────────────
+@router.post("/api/jobs/full-analysis", response_model=JobSubmitResponse, status_code=202)
+async def submit_full_analysis_file(
+    file: UploadFile,
+    use_placeholder: bool = False,
+    language: str = "auto",
+    model: str = "gemini-3.1-pro-preview",
+    segment_duration: int = 180,
+    input_mode: str | None = None,
+) -> JobSubmitResponse:
+    """Upload a video/audio file and queue the full analysis pipeline."""
+    settings = get_settings()
+    manager = get_job_manager()
+    job_id = uuid.uuid4().hex
+    filename = file.filename or "upload"
+
+    if use_placeholder:
+        job = Job.create(job_id, "full-analysis", ())
+
+        async def work(job: Job):
+            return placeholder_response(job.job_id, filename)
+
+        try:
+            return _submit_response(await manager.submit(job, work))
+        except JobQueueFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+
+    ext = Path(filename).suffix.lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type '{ext}'. "
+                   f"Accepted: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
+        )
+    if not settings.elevenlabs_api_key:
+        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
+    try:
+        input_mode = resolve_input_mode(input_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        workspace = await get_workspace_manager().acquire("job", job_id, settings.max_upload_bytes)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    cleanup = workspace.release
+
+    try:
+        media = await ingest_upload(file, job_id, str(workspace), settings.max_upload_bytes)
+        workspace.settle()
+    except UploadTooLargeError as exc:
+        cleanup()
+        raise HTTPException(status_code=413, detail=str(exc))
+    except RuntimeError as exc:
+        cleanup()
+        logger.error("[%s] Runtime error: %s", job_id, exc)
+        raise HTTPException(status_code=500, detail=str(exc))
+    except BaseException:
+        cleanup()
+        raise
+
+    options = AnalysisOptions(
+        language=language,
+        model=model,
+        segment_duration=segment_duration,
+        input_mode=input_mode,
+        gemini_api_key=settings.gemini_api_key,
+    )
+    job = Job.create(job_id, "full-analysis", UPLOAD_STAGES)
+
+    async def work(job: Job):
+        return await run_full_analysis(media, options, job, manager.executor)
+
+    try:
+        job = await manager.submit(job, work, cleanup)
+    except JobQueueFullError as exc:
+        cleanup()
+        raise HTTPException(status_code=503, detail=str(exc))
+    return _submit_response(job)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  POST /api/jobs/full-analysis/youtube  — YouTube URL
+# ─────────────────────────────────────────────────────────────────────────────
+@router.post("/api/jobs/full-analysis/youtube", response_model=JobSubmitResponse, status_code=202)
+async def submit_full_analysis_youtube(body: FullAnalysisRequest) -> JobSubmitResponse:
+    """Queue the full analysis pipeline for a YouTube video."""
+    settings = get_settings()
+    manager = get_job_manager()
+    job_id = uuid.uuid4().hex
+
+    if body.use_placeholder:
+        job = Job.create(job_id, "full-analysis-youtube", ())
+
+        async def work(job: Job):
+            return placeholder_response(job.job_id, body.url)
+
+        try:
+            return _submit_response(await manager.submit(job, work))
+        except JobQueueFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+
+    if not is_valid_youtube_url(body.url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+    if not settings.elevenlabs_api_key:
+        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured.")
+    try:
+        input_mode = resolve_input_mode(body.input_mode)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        workspace = await get_workspace_manager().acquire("jobyt", job_id, DOWNLOAD_RESERVE_BYTES)
+    except WorkspaceQuotaError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    cleanup = workspace.release
+
+    options = AnalysisOptions(
+        language=body.language,
+        model=body.model or settings.gemini_model,
+        segment_duration=body.segment_duration,
+        input_mode=input_mode,
+        gemini_api_key=body.gemini_api_key or settings.gemini_api_key,
+    )
+    job = Job.create(job_id, "full-analysis-youtube", YOUTUBE_STAGES)
+
+    async def work(job: Job):
+        media = await fetch_youtube_media(body.url, job, str(workspace), manager.executor)
+        return await run_full_analysis(media, options, job, manager.executor)
+
+    try:
+        job = await manager.submit(job, work, cleanup)
+    except JobQueueFullError as exc:
+        cleanup()
+        raise HTTPException(status_code=503, detail=str(exc))
+    return _submit_response(job)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  GET /api/jobs/{job_id}  — status + result
+# ─────────────────────────────────────────────────────────────────────────────
+@router.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(job_id: str) -> JobStatusResponse:
+    """Return the status, per-stage progress and (once finished) result of a job.
+
+    Jobs pruned from memory (or from before a restart) are served from the
+    persistent result store if they completed successfully.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        stored = get_result_store().get(job_id)
+        if stored is None or stored.kind != "full-analysis":
+            raise HTTPException(status_code=404, detail="Job not found.")
+        return JobStatusResponse(
+            job_id=stored.job_id,
+            kind=stored.kind,
+            status="succeeded",
+            created_at=stored.created_at,
+            finished_at=stored.created_at,
+            stages=[],
+            result=stored.payload,
+        )
+
+    return JobStatusResponse(
+        job_id=job.job_id,
+        kind=job.kind,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        stages=[
+            JobStage(
+                name=name,
+                status=stage.status,
+                started_at=stage.started_at,
+                finished_at=stage.finished_at,
+                detail=stage.detail,
+            )
+            for name, stage in job.stages.items()
+        ],
+        result=job.result,
+        error=job.error,
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  GET /api/jobs/{job_id}/events  — SSE progress stream
+# ─────────────────────────────────────────────────────────────────────────────
+@router.get("/api/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    last_event_id: str | None = Header(default=None),
+) -> StreamingResponse:
+    """Stream job progress as Server-Sent Events until the job completes."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    try:
+        after_id = int(last_event_id) if last_event_id is not None else -1
+    except ValueError:
+        after_id = -1
+
+    async def event_source():
+        events = job.subscribe(after_id)
+        next_event = asyncio.ensure_future(anext(events))
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_event}, timeout=SSE_KEEPALIVE_SECONDS)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    record = next_event.result()
+                except StopAsyncIteration:
+                    return
+                payload = json.dumps(record["data"], ensure_ascii=False, default=str)
+                yield f"id: {record['id']}\nevent: {record['event']}\ndata: {payload}\n\n"
+                next_event = asyncio.ensure_future(anext(events))
+        finally:
+            # The pending anext() is still running the generator; let the
+            # cancellation land before closing it, or aclose() raises.
+            next_event.cancel()
+            with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                await next_event
+            await events.aclose()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
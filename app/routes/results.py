@@ -0,0 +1,52 @@
+"""
+Stored-result endpoints — read completed analyses back from the persistent
+result store instead of re-running the pipeline.
+
+  GET /api/results            — newest first; filter by kind / media_hash
+  GET /api/results/{job_id}   — one stored result with its full payload
+"""
+from fastapi import APIRouter, HTTPException, Query
+
+from app.schemas.response import StoredResultResponse, StoredResultSummary
+from app.services.result_store import get_result_store
+
+router = APIRouter(tags=["results"])
+
+
+@router.get("/api/results", response_model=list[StoredResultSummary])
+def list_results(
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    kind: str | None = None,
+    media_hash: str | None = None,
+) -> list[StoredResultSummary]:
+    """List stored results (without payloads), newest first."""
+    rows = get_result_store().list_results(
+        limit=limit, offset=offset, kind=kind, media_hash=media_hash,
+    )
+    return [
+        StoredResultSummary(
+            job_id=r.job_id,
+            kind=r.kind,
+            video_source=r.video_source,
+            media_hash=r.media_hash,
+            created_at=r.created_at,
+        )
+        for r in rows
+    ]
+
+
+@router.get("/api/results/{job_id}", response_model=StoredResultResponse)
+def get_result(job_id: str) -> StoredResultResponse:
+    """Return one stored result, including the original response payload."""
+    row = get_result_store().get(job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Result not found.")
+    return StoredResultResponse(
+        job_id=row.job_id,
+        kind=row.kind,
+        video_source=row.video_source,
+        media_hash=row.media_hash,
+        created_at=row.created_at,
+        payload=row.payload,
+    )
@@ -42,13 +42,20 @@ class BodyLanguageRequest(BaseModel):
     gemini_api_key: str | None = None
     model: str = "gemini-3.1-pro-preview"
     segment_duration: int = 180
+    # "video" | "keyframes"; None → server default
+    input_mode: str | None = None
+
+
+class BodyLanguageResumeRequest(BaseModel):
+    gemini_api_key: str | None = None
+    # None → the segments of the stored run
+    segment_duration: int | None = None
 
 
 class SegmentResult(BaseModel):
     segment: int
     start: str
     end: str
-    file: str
     chars: int
     error: str | None = None
 
@@ -60,15 +67,29 @@ class BodyLanguageResponse(BaseModel):
     model: str
     total_segments: int
     segments: list[SegmentResult]
-    combined_report_path: str
+    # The full report (markdown per segment) is served from the result store.
+    result_url: str
 
 
 # ── Full analysis (unified pipeline) ─────────────────────────────────────────
+class BodyLanguageObservation(BaseModel):
+    timestamp: str
+    label: str = ""
+    posture: str = ""
+    gestures: str = ""
+    expressions: str = ""
+    movement: str = ""
+    interaction: str = ""
+    significance: str = ""
+
+
 class BodyLanguageSegmentReport(BaseModel):
     segment: int
     start: str
     end: str
     markdown: str
+    # Only for batched (structured JSON) runs
+    observations: list[BodyLanguageObservation] | None = None
 
 
 class FullAnalysisRequest(BaseModel):
@@ -78,6 +99,14 @@ class FullAnalysisRequest(BaseModel):
     gemini_api_key: str | None = None
     model: str = "gemini-3.1-pro-preview"
     segment_duration: int = 180
+    # "video" | "keyframes"; None → server default
+    input_mode: str | None = None
+
+
+class KeyframeSamplingInfo(BaseModel):
+    fps: float
+    width: int
+    quality: int
 
 
 class BodyLanguageSummary(BaseModel):
@@ -85,6 +114,9 @@ class BodyLanguageSummary(BaseModel):
     total_segments: int
     segments: list[BodyLanguageSegmentReport]
     combined_report: str
+    # "video" | "keyframes"; sampling only for keyframe runs
+    input_mode: str = "video"
+    keyframe_sampling: KeyframeSamplingInfo | None = None
 
 
 class FullAnalysisResponse(BaseModel):
@@ -98,10 +130,20 @@ class FullAnalysisResponse(BaseModel):
 
 
 # ── Dashboard ────────────────────────────────────────────────────────────────
+class ProviderCallStats(BaseModel):
+    # Outbound API calls since startup; each retry attempt counts as a call.
+    calls: int = 0
+    failures: int = 0
+    retries: int = 0
+    avg_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
 class ServiceStatus(BaseModel):
     name: str
     configured: bool
     label: str
+    calls: ProviderCallStats | None = None
 
 
 class DashboardStats(BaseModel):
@@ -109,6 +151,9 @@ class DashboardStats(BaseModel):
     full_analyses: int
     feedback_generated: int
     uptime_seconds: int
+    gemini_processing_waits: int = 0
+    gemini_processing_wait_avg_seconds: float = 0.0
+    gemini_processing_wait_max_seconds: float = 0.0
 
 
 class DashboardResponse(BaseModel):
@@ -131,3 +176,42 @@ class FeedbackResponse(BaseModel):
     status: str = "success"
     feedback: str
     model: str
+
+
+# ── Background jobs ──────────────────────────────────────────────────────────
+class JobStage(BaseModel):
+    name: str
+    status: str              # pending | running | done | skipped | failed
+    started_at: float | None = None
+    finished_at: float | None = None
+    detail: str | None = None
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str              # queued | running | succeeded | failed
+    created_at: float
+    finished_at: float | None = None
+    stages: list[JobStage]
+    result: FullAnalysisResponse | None = None
+    error: str | None = None
+
+
+# ── Stored results ───────────────────────────────────────────────────────────
+class StoredResultSummary(BaseModel):
+    job_id: str
+    kind: str                # transcript | body-language | full-analysis
+    video_source: str | None = None
+    media_hash: str | None = None
+    created_at: float
+
+
+class StoredResultResponse(StoredResultSummary):
+    payload: dict
@@ -0,0 +1,379 @@
+"""Full-analysis pipeline: transcription → body language → rubric evaluation.
+
+Shared by the synchronous ``/api/full-analysis`` endpoints and the job API.
+The pipeline reports stage transitions on a :class:`~app.services.job_manager.Job`.
+Provider calls are awaited directly; only local blocking work (ffmpeg,
+yt-dlp, ffprobe, SQLite) runs on the executor it is given (the job
+manager's stage pool for background jobs, the loop default for inline
+requests).
+
+Stage outputs for uploaded files are cached by media SHA-256 in the
+content-addressed result cache; YouTube inputs are not cached.  Completed
+responses are archived in the persistent result store under their job_id.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.config import get_settings
+from app.schemas.response import (
+    BodyLanguageSegmentReport,
+    BodyLanguageSummary,
+    FullAnalysisResponse,
+    KeyframeSamplingInfo,
+    TranscriptResult,
+    TranscriptSegment,
+)
+from app.services.audio_utils import (
+    STREAMABLE_AUDIO_EXTENSIONS,
+    extract_audio,
+    extract_audio_from_stream,
+)
+from app.services.elevenlabs_transcribe import ElevenLabsTranscribeService
+from app.services.gemini_body_language import (
+    BODY_LANGUAGE_PROMPT_VERSION,
+    BodyLanguageReport,
+    analyze_body_language,
+    download_youtube_video,
+    get_video_duration,
+    keyframe_sampling_from_settings,
+    resolve_input_mode,
+    upload_video_to_gemini,
+)
+from app.services.gemini_evaluation import evaluate_with_gemini, rubric_version
+from app.services.job_manager import Job
+from app.services.placeholder_data import (
+    PLACEHOLDER_RUBRIC_EVALUATION,
+    load_placeholder_body_language,
+)
+from app.services.result_cache import file_hash, get_result_cache, make_key, text_hash
+from app.services.result_store import get_result_store
+from app.services.session_stats import stats as session_stats
+from app.services.upload_utils import iter_upload, save_upload
+from app.services.video_activity import fixed_segments, plan_adaptive_segments
+from app.services.youtube_service import YouTubeDownloader
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm"}
+
+UPLOAD_STAGES = ("transcription", "body_language", "rubric")
+YOUTUBE_STAGES = ("download", "transcription", "body_language", "rubric")
+
+
+@dataclass
+class AnalysisOptions:
+    """Per-request knobs of the live pipeline."""
+    language: str = "auto"
+    model: str = "gemini-3.1-pro-preview"
+    segment_duration: int = 180
+    gemini_api_key: str = ""
+    # "video" | "keyframes"; None → the gemini_input_mode setting
+    input_mode: str | None = None
+
+
+@dataclass
+class MediaInput:
+    """Local media for one job.
+
+    ``wav_path`` exists already when the audio was streamed or downloaded;
+    otherwise it is extracted from ``raw_path`` on demand.  ``video_path`` is
+    None for audio-only inputs, which skips body-language analysis.
+    """
+    source: str
+    work_dir: str
+    wav_path: str
+    raw_path: str | None = None
+    video_path: str | None = None
+    media_hash: str | None = None
+
+
+def build_transcript_result(ws_result, job_id: str) -> TranscriptResult:
+    segments = [
+        TranscriptSegment(start=s.start, end=s.end, text=s.text)
+        for s in ws_result.segments
+    ]
+    return TranscriptResult(
+        job_id=job_id,
+        language=ws_result.language,
+        duration=round(ws_result.duration, 2),
+        full_text=ws_result.full_text,
+        segments=segments,
+        srt_content=ws_result.srt_content,
+    )
+
+
+def build_body_language_summary(report: BodyLanguageReport) -> BodyLanguageSummary:
+    return BodyLanguageSummary(
+        model=report.model,
+        total_segments=len(report.segments),
+        segments=[
+            BodyLanguageSegmentReport(
+                segment=seg.segment, start=seg.start, end=seg.end, markdown=seg.markdown,
+                observations=seg.observations,
+            )
+            for seg in report.segments
+        ],
+        combined_report=report.combined_report,
+        input_mode=report.input_mode,
+        keyframe_sampling=(
+            KeyframeSamplingInfo(**asdict(report.keyframe_sampling))
+            if report.keyframe_sampling is not None else None
+        ),
+    )
+
+
+def placeholder_response(job_id: str, video_source: str) -> FullAnalysisResponse:
+    """Return the pre-analyzed "Mark John" demo result."""
+    session_stats.full_analyses += 1
+    return FullAnalysisResponse(
+        job_id=job_id,
+        video_source=video_source,
+        is_placeholder=True,
+        transcript=None,
+        body_language=load_placeholder_body_language(),
+        rubric_evaluation=PLACEHOLDER_RUBRIC_EVALUATION,
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Input acquisition
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def ingest_upload(
+    file: UploadFile,
+    job_id: str,
+    work_dir: str,
+    max_bytes: int,
+) -> MediaInput:
+    """Stream an upload into *work_dir* and hash it on the way.
+
+    Audio-only containers are piped straight into ffmpeg; everything else is
+    saved as ``input{ext}`` for later extraction and the Gemini upload.
+    Raises UploadTooLargeError past *max_bytes*.
+    """
+    filename = file.filename or "upload"
+    ext = Path(filename).suffix.lower()
+    work = Path(work_dir)
+    wav_path = str(work / "audio.wav")
+    digest = hashlib.sha256()
+
+    if ext in STREAMABLE_AUDIO_EXTENSIONS:
+        await extract_audio_from_stream(iter_upload(file, max_bytes, digest=digest), wav_path)
+        logger.info("[%s] Streamed upload into ffmpeg: %s", job_id, filename)
+        return MediaInput(
+            source=filename, work_dir=work_dir, wav_path=wav_path,
+            media_hash=digest.hexdigest(),
+        )
+
+    raw_path = str(work / f"input{ext}")
+    size = await save_upload(file, raw_path, max_bytes, digest=digest)
+    logger.info("[%s] Saved upload: %s (%.1f MB)", job_id, filename, size / 1e6)
+    return MediaInput(
+        source=filename, work_dir=work_dir, wav_path=wav_path, raw_path=raw_path,
+        video_path=raw_path if ext in VIDEO_EXTENSIONS else None,
+        media_hash=digest.hexdigest(),
+    )
+
+
+async def fetch_youtube_media(
+    url: str,
+    job: Job,
+    work_dir: str,
+    executor: Executor | None = None,
+) -> MediaInput:
+    """Download video (for Gemini) and audio (for STT) of a YouTube lesson."""
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+
+    job.start_stage("download")
+    video_path = await loop.run_in_executor(
+        executor, download_youtube_video, url, work_dir,
+    )
+    logger.info("[%s] YouTube video downloaded: %s", job.job_id, video_path)
+
+    downloader = YouTubeDownloader(settings)
+    wav_path = await loop.run_in_executor(
+        executor, downloader.download_audio, url, job.job_id, work_dir,
+    )
+    logger.info("[%s] YouTube audio ready: %s", job.job_id, wav_path)
+    job.finish_stage("download")
+
+    return MediaInput(
+        source=url, work_dir=work_dir, wav_path=wav_path, video_path=video_path,
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Pipeline
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def run_full_analysis(
+    media: MediaInput,
+    options: AnalysisOptions,
+    job: Job,
+    executor: Executor | None = None,
+) -> FullAnalysisResponse:
+    """Run transcription → body language → rubric evaluation for *media*.
+
+    Without a Gemini key the body-language and rubric stages fall back to
+    the placeholder data, as the synchronous endpoints always did.
+    """
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    job_id = job.job_id
+    api_key = options.gemini_api_key
+    use_gemini = bool(api_key)
+    model = options.model
+    cache = get_result_cache() if media.media_hash else None
+
+    # Step 1: Extract audio + transcribe
+    job.start_stage("transcription")
+    transcript_key = make_key(
+        media.media_hash or "", "transcript",
+        language=options.language, model=settings.elevenlabs_stt_model,
+        codec=settings.stt_upload_codec,
+    )
+    cached = cache.get(transcript_key) if cache else None
+    if cached is not None:
+        transcript_result = TranscriptResult(job_id=job_id, **cached)
+        logger.info("[%s] Transcript served from cache", job_id)
+        job.finish_stage("transcription", "cached", transcript_result.model_dump())
+    else:
+        if media.raw_path and not Path(media.wav_path).is_file():
+            await loop.run_in_executor(executor, extract_audio, media.raw_path, media.wav_path)
+            logger.info("[%s] Audio extracted", job_id)
+
+        svc = ElevenLabsTranscribeService.from_settings(settings)
+        ws_result = await svc.transcribe_async(media.wav_path, options.language)
+        transcript_result = build_transcript_result(ws_result, job_id)
+        if cache:
+            cache.put(transcript_key, transcript_result.model_dump(exclude={"job_id"}))
+        logger.info("[%s] Transcription done: %d segments", job_id, len(ws_result.segments))
+        job.finish_stage("transcription", partial=transcript_result.model_dump())
+
+    # Step 2: Body language analysis (only for video inputs)
+    body_language: BodyLanguageSummary | None = None
+    # Hash the stored result is keyed by; hashed below for YouTube videos.
+    video_hash = media.media_hash
+    if media.video_path is None:
+        job.skip_stage("body_language", "audio-only input")
+    elif not use_gemini:
+        body_language = load_placeholder_body_language()
+        logger.info("[%s] Body language: using fallback from body_language_analysis/", job_id)
+        job.skip_stage("body_language", "placeholder")
+    else:
+        job.start_stage("body_language")
+        input_mode = resolve_input_mode(options.input_mode)
+        keyframes = keyframe_sampling_from_settings() if input_mode == "keyframes" else None
+        bl_key = make_key(
+            media.media_hash or "", "body_language",
+            model=model, segment_duration=options.segment_duration,
+            prompt=BODY_LANGUAGE_PROMPT_VERSION,
+            adaptive=settings.body_language_adaptive_segments,
+            batch=settings.gemini_batch_windows,
+            input=keyframes.signature if keyframes else input_mode,
+        )
+        cached = cache.get(bl_key) if cache else None
+        if cached is not None:
+            body_language = BodyLanguageSummary(**cached)
+            logger.info("[%s] Body language served from cache", job_id)
+            job.finish_stage("body_language", "cached", body_language.model_dump())
+        else:
+            # YouTube inputs are not result-cached, but their segments are
+            # still checkpointed by content hash.
+            video_hash = video_hash or await loop.run_in_executor(
+                executor, file_hash, media.video_path,
+            )
+            duration = await loop.run_in_executor(executor, get_video_duration, media.video_path)
+            planning = None
+            if settings.body_language_adaptive_segments:
+                # The motion pass runs while Gemini processes the upload.
+                planning = loop.run_in_executor(
+                    executor, plan_adaptive_segments,
+                    media.video_path, duration, options.segment_duration,
+                )
+            file_uri = None
+            if keyframes is None:
+                file_uri = await upload_video_to_gemini(
+                    api_key, media.video_path, video_hash,
+                    on_processing_wait=lambda seconds: job.emit(
+                        "gemini_processing", seconds=round(seconds, 1),
+                    ),
+                )
+            spans = (
+                await planning if planning is not None
+                else fixed_segments(duration, options.segment_duration)
+            )
+            total = len(spans)
+
+            def on_segment(info: dict, markdown: str) -> None:
+                job.emit("segment_finished", total=total, markdown=markdown, **info)
+
+            # Full analyses return everything inline, so nothing goes to disk.
+            bl_report = await analyze_body_language(
+                api_key, model, file_uri, duration, None, options.segment_duration,
+                on_segment=on_segment, media_hash=video_hash, spans=spans,
+                keyframe_video=media.video_path if keyframes else None,
+                keyframe_sampling=keyframes,
+            )
+            body_language = build_body_language_summary(bl_report)
+            # Never pin a run with failed segments in the cache.
+            if cache and not bl_report.failed:
+                cache.put(bl_key, body_language.model_dump())
+            logger.info("[%s] Body language analysis done: %d segments", job_id, len(bl_report.segments))
+            job.finish_stage(
+                "body_language", f"{len(bl_report.segments)} segments", body_language.model_dump(),
+            )
+
+    # Step 3: Rubric evaluation (Gemini or fallback)
+    bl_report = body_language.combined_report if body_language else None
+    if use_gemini:
+        job.start_stage("rubric")
+        rubric_key = make_key(
+            media.media_hash or "", "rubric",
+            model=model, rubric=rubric_version(),
+            inputs=text_hash(transcript_result.full_text, bl_report),
+        )
+        rubric_evaluation = cache.get(rubric_key) if cache else None
+        if rubric_evaluation is not None:
+            logger.info("[%s] Rubric evaluation served from cache", job_id)
+            job.finish_stage("rubric", "cached", rubric_evaluation)
+        else:
+            rubric_evaluation = await evaluate_with_gemini(
+                api_key, model, transcript_result.full_text, bl_report,
+            )
+            if cache:
+                cache.put(rubric_key, rubric_evaluation)
+            logger.info("[%s] Rubric evaluation done", job_id)
+            job.finish_stage("rubric", partial=rubric_evaluation)
+    else:
+        rubric_evaluation = PLACEHOLDER_RUBRIC_EVALUATION
+        logger.info("[%s] Rubric: using fallback from body_language_analysis/", job_id)
+        job.skip_stage("rubric", "placeholder")
+
+    response = FullAnalysisResponse(
+        job_id=job_id,
+        video_source=media.source,
+        is_placeholder=False,
+        transcript=transcript_result,
+        body_language=body_language,
+        rubric_evaluation=rubric_evaluation,
+    )
+    await loop.run_in_executor(
+        executor,
+        partial(
+            get_result_store().save, job_id, "full-analysis", response,
+            video_source=media.source, media_hash=video_hash,
+        ),
+    )
+    session_stats.full_analyses += 1
+    return response
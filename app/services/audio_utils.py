@@ -1,12 +1,20 @@
+import asyncio
 import logging
 import shutil
+import subprocess
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 import ffmpeg
 
 logger = logging.getLogger(__name__)
 
+# Containers ffmpeg can demux from a non-seekable pipe.  MP4-family files
+# (.mp4/.m4a/.mov) are left out because their index (moov atom) is often
+# written at the end of the file, which ffmpeg cannot reach through stdin.
+STREAMABLE_AUDIO_EXTENSIONS = {".wav", ".mp3", ".ogg", ".flac"}
+
 
 def _find_ffmpeg() -> str:
     """Return the path to an ffmpeg binary.
@@ -33,7 +41,7 @@ def _find_ffmpeg() -> str:
 _ffmpeg_bin: Optional[str] = None
 
 
-def _get_ffmpeg_bin() -> str:
+def get_ffmpeg_bin() -> str:
     """Return the ffmpeg binary path, resolving lazily so the app can start without ffmpeg."""
     global _ffmpeg_bin
     if _ffmpeg_bin is None:
@@ -61,7 +69,7 @@ def extract_audio(input_path: str, output_path: str) -> str:
             .input(input_path, err_detect="ignore_err")
             .output(output_path, ac=1, ar=16000, acodec="pcm_s16le")
             .overwrite_output()
-            .run(cmd=_get_ffmpeg_bin(), capture_stdout=True, capture_stderr=True)
+            .run(cmd=get_ffmpeg_bin(), capture_stdout=True, capture_stderr=True)
         )
     except ffmpeg.Error as exc:
         stderr_text = exc.stderr.decode("utf-8", errors="replace") if exc.stderr else "unknown"
@@ -79,3 +87,120 @@ def extract_audio(input_path: str, output_path: str) -> str:
         raise RuntimeError(f"ffmpeg did not produce output file: {output_path}")
 
     return output_path
+
+
+async def extract_audio_from_stream(
+    chunks: AsyncIterator[bytes],
+    output_path: str,
+) -> str:
+    """Pipe *chunks* into ffmpeg's stdin and write mono 16 kHz WAV to *output_path*.
+
+    Same output format as :func:`extract_audio`, but ffmpeg reads the source
+    from stdin, so no second copy of it is written to disk.  (For an
+    ``UploadFile`` the body has already been received and spooled by
+    Starlette; this only saves the copy into the workspace.)  Only use
+    this for containers in ``STREAMABLE_AUDIO_EXTENSIONS``.
+
+    If *chunks* raises (e.g. the upload exceeds its size limit), ffmpeg is
+    killed, the partial output is removed and the exception propagates.
+    """
+    proc = subprocess.Popen(
+        [
+            get_ffmpeg_bin(), "-hide_banner", "-loglevel", "error",
+            "-err_detect", "ignore_err",
+            "-i", "pipe:0",
+            "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le",
+            "-y", output_path,
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+    # Drain stderr on a side thread so a chatty ffmpeg can never block on a
+    # full pipe while we are still feeding stdin.
+    stderr_chunks: list[bytes] = []
+    drain = threading.Thread(
+        target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True,
+    )
+    drain.start()
+
+    loop = asyncio.get_running_loop()
+    try:
+        async for chunk in chunks:
+            try:
+                await loop.run_in_executor(None, proc.stdin.write, chunk)
+            except BrokenPipeError:
+                # ffmpeg gave up on the input; its exit code tells us why.
+                break
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = await loop.run_in_executor(None, proc.wait)
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    finally:
+        drain.join(timeout=5)
+
+    if returncode != 0:
+        stderr_text = b"".join(stderr_chunks).decode("utf-8", errors="replace") or "unknown"
+        if Path(output_path).is_file() and Path(output_path).stat().st_size > 0:
+            logger.warning("ffmpeg reported errors but produced output — continuing")
+        else:
+            logger.error("ffmpeg failed: %s", stderr_text)
+            raise RuntimeError(f"Audio extraction failed: {stderr_text}")
+
+    if not Path(output_path).is_file():
+        raise RuntimeError(f"ffmpeg did not produce output file: {output_path}")
+
+    return output_path
+
+
+# ffmpeg output options per STT upload codec: (args, container extension, MIME type)
+_ENCODERS: dict[str, tuple[list[str], str, str]] = {
+    "flac": (["-c:a", "flac", "-compression_level", "8", "-f", "flac"], "flac", "audio/flac"),
+    "opus": (
+        ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "ogg"],
+        "ogg", "audio/ogg",
+    ),
+    "wav": (["-c:a", "pcm_s16le", "-f", "wav"], "wav", "audio/wav"),
+}
+
+
+def encoder_info(codec: str) -> tuple[str, str]:
+    """Return ``(file_extension, mime_type)`` for an upload *codec*."""
+    try:
+        _args, ext, mime = _ENCODERS[codec]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported upload codec '{codec}'. Accepted: {', '.join(sorted(_ENCODERS))}"
+        ) from None
+    return ext, mime
+
+
+def encode_pcm(pcm: memoryview, sample_rate: int, codec: str) -> bytes:
+    """Encode raw mono s16le *pcm* with ffmpeg and return the encoded file bytes.
+
+    Input and output go through pipes, so nothing touches disk.
+    Raises ValueError for an unknown codec, RuntimeError if ffmpeg fails.
+    """
+    encoder_info(codec)
+    args = _ENCODERS[codec][0]
+    proc = subprocess.run(
+        [
+            get_ffmpeg_bin(), "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            *args, "pipe:1",
+        ],
+        input=pcm,
+        capture_output=True,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        stderr_text = proc.stderr.decode("utf-8", errors="replace") or "unknown"
+        logger.error("ffmpeg %s encode failed: %s", codec, stderr_text)
+        raise RuntimeError(f"Audio encoding ({codec}) failed: {stderr_text}")
+    return proc.stdout
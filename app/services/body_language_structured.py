@@ -0,0 +1,159 @@
+"""Batched, schema-constrained body-language requests.
+
+One Gemini request covers several consecutive windows and returns JSON
+(``BATCH_RESPONSE_SCHEMA``): per window, a list of observations keyed by
+timestamp with posture, gestures, expressions, movement, interaction and
+significance.  The observations are kept as structured data and also
+rendered into the same markdown layout the free-form prompt asks for, so
+the combined report and the rubric evaluation read the same either way.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+
+OBSERVATION_FIELDS = {
+    "posture": "Posture",
+    "gestures": "Hand/Arm Gestures",
+    "expressions": "Facial Expressions",
+    "movement": "Movement/Positioning",
+    "interaction": "Interaction Style",
+    "significance": "Pedagogical Significance",
+}
+
+BODY_LANGUAGE_BATCH_PROMPT = """You are an expert in nonverbal communication and teaching pedagogy. \
+Analyze ONLY the following windows of this teaching video, each on its own:
+
+{windows}
+
+Focus EXCLUSIVELY on the teacher's body language, physical movements, and nonverbal communication. \
+Be extremely detailed and precise.
+
+Return one entry per window, with "start" and "end" exactly as listed above. For each notable moment \
+in a window add an observation with:
+
+- timestamp: MM:SS within the window, and a brief label
+- posture: overall body posture (standing, leaning, sitting, shifting weight, etc.)
+- gestures: specific hand and arm movements (pointing, open palms, counting on fingers, illustrative \
+gestures, holding objects, writing, etc.)
+- expressions: facial expressions (smiling, raised eyebrows, nodding, looking puzzled, making eye \
+contact, looking at slides, etc.)
+- movement: where the teacher is in the room (moving toward students, standing at the front, \
+circulating, approaching a desk, etc.)
+- interaction: how the body language relates to what's being said (reinforcing, contradicting, \
+adding emphasis)
+- significance: what the body language communicates to students (confidence, approachability, \
+authority, encouragement, urgency, etc.)
+
+Cover EVERY notable body language moment in every window. Aim for at least one observation every \
+15-30 seconds of video. Do not skip any part of any window.
+"""
+
+_STRING = {"type": "STRING"}
+
+BATCH_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "windows": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "start": _STRING,
+                    "end": _STRING,
+                    "observations": {
+                        "type": "ARRAY",
+                        "items": {
+                            "type": "OBJECT",
+                            "properties": {
+                                "timestamp": _STRING,
+                                "label": _STRING,
+                                **{name: _STRING for name in OBSERVATION_FIELDS},
+                            },
+                            "required": ["timestamp", "label", *OBSERVATION_FIELDS],
+                            "propertyOrdering": ["timestamp", "label", *OBSERVATION_FIELDS],
+                        },
+                    },
+                },
+                "required": ["start", "end", "observations"],
+                "propertyOrdering": ["start", "end", "observations"],
+            },
+        },
+    },
+    "required": ["windows"],
+}
+
+BATCH_GENERATION_CONFIG = {
+    "responseMimeType": "application/json",
+    "responseSchema": BATCH_RESPONSE_SCHEMA,
+}
+
+# Changes whenever the prompt or schema is edited; keys batched checkpoints.
+BODY_LANGUAGE_BATCH_PROMPT_VERSION = hashlib.sha256(
+    (BODY_LANGUAGE_BATCH_PROMPT + json.dumps(BATCH_RESPONSE_SCHEMA, sort_keys=True)).encode("utf-8")
+).hexdigest()[:12]
+
+
+def build_batch_prompt(windows: list[tuple[str, str]]) -> str:
+    """Prompt for the ``(start_ts, end_ts)`` *windows*."""
+    listing = "\n".join(f"- {start} to {end}" for start, end in windows)
+    return BODY_LANGUAGE_BATCH_PROMPT.format(windows=listing)
+
+
+def _clean_observation(raw: dict) -> dict:
+    obs = {"timestamp": str(raw.get("timestamp", "")), "label": str(raw.get("label", ""))}
+    for name in OBSERVATION_FIELDS:
+        obs[name] = str(raw.get(name, ""))
+    return obs
+
+
+def parse_batch_response(
+    text: str, windows: list[tuple[str, str]],
+) -> dict[tuple[str, str], list[dict]]:
+    """Map each requested ``(start_ts, end_ts)`` window to its observations.
+
+    Windows the model left out are missing from the result.  Raises
+    ValueError if *text* is not the JSON the schema asks for.
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Batched response is not valid JSON: {exc}") from None
+    entries = data.get("windows") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError("Batched response has no 'windows' list")
+
+    by_start = {
+        str(entry.get("start", "")).strip(): entry
+        for entry in entries if isinstance(entry, dict)
+    }
+    matched = {w: by_start.get(w[0]) for w in windows}
+    if not any(matched.values()) and len(entries) == len(windows):
+        # Timestamps reformatted (e.g. "0:00") — fall back to order.
+        matched = dict(zip(windows, entries))
+
+    result: dict[tuple[str, str], list[dict]] = {}
+    for window, entry in matched.items():
+        if not isinstance(entry, dict):
+            continue
+        observations = entry.get("observations") or []
+        result[window] = [_clean_observation(o) for o in observations if isinstance(o, dict)]
+    return result
+
+
+def render_observations(observations: list[dict]) -> str:
+    """Render *observations* in the markdown layout of the free-form prompt."""
+    if not observations:
+        return "*No notable body language observed in this segment.*\n"
+    blocks = []
+    for obs in observations:
+        heading = f"### Timestamp [{obs['timestamp']}]"
+        if obs.get("label"):
+            heading += f" — {obs['label']}"
+        lines = [heading]
+        lines.extend(
+            f"**{title}:** {obs[name]}"
+            for name, title in OBSERVATION_FIELDS.items() if obs.get(name)
+        )
+        blocks.append("\n\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
@@ -4,14 +4,41 @@ ElevenLabs Speech-to-Text transcription service.
 Uses the ElevenLabs Scribe API (POST /v1/speech-to-text) to transcribe
 audio/video files. Supports 90+ languages with automatic detection,
 word-level timestamps, and segment output compatible with our API schema.
+
+WAV input is encoded (FLAC by default, see ``stt_upload_codec``) before
+upload, which roughly halves the bytes sent for lossless FLAC and cuts
+them ~8x for Opus.
+
+Requests go through the shared pooled clients in ``http_client`` (blocking
+or asyncio) and are retried on 429/5xx and connection errors
+(``elevenlabs_max_retries``).
+
+Long WAVs (over ``elevenlabs_chunk_seconds``) are cut at pauses into
+slightly overlapping chunks that are transcribed concurrently; word
+timestamps are shifted back to recording time and merged, so the result
+has the same shape as a single request.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
-import requests
+import httpx
+
+from app.services.http_client import arequest_with_retry, request_with_retry
+from app.services.pcm_audio import PcmAudio
+from app.services.stt_chunking import (
+    DEFAULT_CODEC,
+    ChunkPlan,
+    EncodedChunk,
+    encode_chunk,
+    plan_chunks,
+    reconcile_language,
+    stitch_segments,
+)
 
 if False:
     from app.config import Settings
@@ -20,6 +47,17 @@ logger = logging.getLogger(__name__)
 
 ELEVENLABS_STT_URL = "https://api.elevenlabs.io/v1/speech-to-text"
 DEFAULT_MODEL = "scribe_v2"
+# Scribe accepts uploads up to 3 GB; stay under it.
+ELEVENLABS_MAX_UPLOAD_BYTES = 3 * 1000 * 1000 * 1000 - 10 * 1024 * 1024
+DEFAULT_MAX_RETRIES = 3
+# Longer WAVs are split into chunks of about this length, sent concurrently.
+DEFAULT_CHUNK_SECONDS = 600
+DEFAULT_MAX_CONCURRENCY = 4
+# Audio repeated at the start of each chunk, in case a cut lands mid-word.
+DEFAULT_CHUNK_OVERLAP_SECONDS = 1.0
+# (connect, read) seconds; long recordings take minutes to transcribe.
+_TIMEOUT = (10, 600)
+_ASYNC_TIMEOUT = httpx.Timeout(600.0, connect=10.0, pool=None)
 
 
 @dataclass
@@ -101,52 +139,151 @@ def _words_to_segments(words: list[dict]) -> list[Segment]:
     return segments
 
 
-class ElevenLabsTranscribeService:
-    """Transcribes audio using ElevenLabs Scribe API."""
+def _parse_response(body: dict) -> tuple[str, list[dict], str]:
+    """Return ``(text, words, language)`` from a Scribe response body."""
+    # Handle multichannel response
+    if "transcripts" in body:
+        chunk = body["transcripts"][0]
+    else:
+        chunk = body
+
+    text = chunk.get("text", "")
+    words = chunk.get("words", [])
+    lang = chunk.get("language_code", "unknown") or "unknown"
+    if isinstance(lang, str) and len(lang) >= 3:
+        lang = lang[:3].lower()
+    return text, words, lang
+
+
+def _shift_words(words: list[dict], offset: float) -> list[Segment]:
+    """Chunk-relative Scribe words → absolute-time word segments."""
+    return [
+        Segment(
+            start=float(w.get("start", 0)) + offset,
+            end=float(w.get("end", 0)) + offset,
+            text=w.get("text", ""),
+        )
+        for w in words
+    ]
+
+
+def _open_audio(audio: PcmAudio | str) -> tuple[Path, PcmAudio | None]:
+    """``(path, pcm)`` for a shared buffer or a file path.
+
+    WAV paths are mapped so they can be chunked and re-encoded; other
+    files are uploaded as they are (*pcm* is None).
+    """
+    if isinstance(audio, PcmAudio):
+        return Path(audio.path or "audio.wav"), audio
+    path = Path(audio)
+    if not path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio}")
+    return path, (PcmAudio.from_wav(audio) if path.suffix.lower() == ".wav" else None)
 
-    def __init__(self, api_key: str, model_id: str = DEFAULT_MODEL) -> None:
+
+def _merge_chunks(
+    results: list[tuple[EncodedChunk, list[Segment], str]],
+) -> tuple[str, list[dict], str]:
+    """Stitch per-chunk words into the ``(text, words, language)`` of one request.
+
+    A word is kept only from the chunk that owns its midpoint, so the
+    overlap is not transcribed twice.
+    """
+    stitched = stitch_segments([(chunk.plan, words) for chunk, words, _lang in results])
+    words = [{"text": w.text, "start": w.start, "end": w.end} for w in stitched]
+    text = " ".join(w.text.strip() for w in stitched if w.text.strip())
+    lang = reconcile_language([
+        (lang, chunk.end - chunk.start) for chunk, _words, lang in results
+    ])
+    return text, words, lang
+
+
+class ElevenLabsTranscribeService:
+    """Transcribes audio using ElevenLabs Scribe API.
+
+    :meth:`transcribe` blocks (for executor threads and scripts);
+    :meth:`transcribe_async` is the same on the shared async HTTP pool.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model_id: str = DEFAULT_MODEL,
+        upload_codec: str = DEFAULT_CODEC,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        chunk_overlap: float = DEFAULT_CHUNK_OVERLAP_SECONDS,
+    ) -> None:
         if not api_key:
             raise ValueError("ELEVENLABS_API_KEY is required for transcription.")
         self._api_key = api_key
         self._model_id = model_id
+        self._upload_codec = upload_codec
+        self._max_retries = max_retries
+        self._chunk_seconds = chunk_seconds
+        self._max_concurrency = max(1, max_concurrency)
+        self._chunk_overlap = chunk_overlap
+
+    @classmethod
+    def from_settings(cls, settings: "Settings") -> "ElevenLabsTranscribeService":
+        return cls(
+            settings.elevenlabs_api_key,
+            settings.elevenlabs_stt_model,
+            settings.stt_upload_codec,
+            settings.elevenlabs_max_retries,
+            settings.elevenlabs_chunk_seconds,
+            settings.elevenlabs_max_concurrency,
+            settings.elevenlabs_chunk_overlap_seconds,
+        )
 
-    def transcribe(self, audio_path: str, language: str = "auto") -> TranscribeResult:
-        """Transcribe an audio file and return structured results."""
-        path = Path(audio_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-
-        with open(audio_path, "rb") as f:
-            files = {"file": (path.name, f, "audio/wav")}
-            data: dict = {"model_id": self._model_id}
-            if language and language != "auto":
-                data["language_code"] = language
-
-            headers = {"xi-api-key": self._api_key}
-
-            resp = requests.post(
-                ELEVENLABS_STT_URL,
-                headers=headers,
-                files=files,
-                data=data,
-                timeout=600,
-            )
-
-        resp.raise_for_status()
-        body = resp.json()
-
-        # Handle multichannel response
-        if "transcripts" in body:
-            chunk = body["transcripts"][0]
-        else:
-            chunk = body
-
-        text = chunk.get("text", "")
-        words = chunk.get("words", [])
-        lang = chunk.get("language_code", "unknown") or "unknown"
-        if isinstance(lang, str) and len(lang) >= 3:
-            lang = lang[:3].lower()
+    # ── request building ───────────────────────────────────────────────────
+    def _upload_payload(self, path: Path, audio: PcmAudio | None) -> tuple[str, bytes, str]:
+        """File part for the upload; WAV is encoded, anything else sent unchanged.
+
+        Always bytes (never an open file) so a retry can send it again.
+        """
+        if audio is None:
+            return path.name, path.read_bytes(), "audio/wav"
+        if self._upload_codec == "wav":
+            return path.name, audio.wav_bytes(), "audio/wav"
+        pieces = encode_chunk(
+            audio, ChunkPlan.whole(audio), self._upload_codec, ELEVENLABS_MAX_UPLOAD_BYTES,
+        )
+        if len(pieces) > 1:
+            raise RuntimeError("Recording is too long for a single ElevenLabs upload.")
+        chunk = pieces[0]
+        logger.info("Encoded %s for upload: %.1f MB → %.1f MB (%s)",
+                    path.name, audio.nbytes / 1e6, len(chunk.data) / 1e6,
+                    self._upload_codec)
+        return f"{path.stem}{Path(chunk.filename).suffix}", chunk.data, chunk.content_type
+
+    def _request_kwargs(self, file_part: tuple[str, bytes, str], language: str) -> dict:
+        data: dict = {"model_id": self._model_id}
+        if language and language != "auto":
+            data["language_code"] = language
+        return {
+            "provider": "elevenlabs",
+            "max_retries": self._max_retries,
+            "headers": {"xi-api-key": self._api_key},
+            "files": {"file": file_part},
+            "data": data,
+        }
+
+    def _plan(self, audio: PcmAudio | None) -> list[ChunkPlan] | None:
+        """Chunk plans for a long WAV, or None to send it in one request."""
+        if audio is None or not self._chunk_seconds or audio.duration <= self._chunk_seconds:
+            return None
+        plans = plan_chunks(
+            audio, self._upload_codec, ELEVENLABS_MAX_UPLOAD_BYTES,
+            overlap=self._chunk_overlap, max_seconds=self._chunk_seconds,
+        )
+        logger.info("ElevenLabs: %.1fs audio split into %d %s chunk(s), %d concurrent",
+                    audio.duration, len(plans), self._upload_codec,
+                    min(self._max_concurrency, len(plans)))
+        return plans
 
+    def _build_result(self, text: str, words: list[dict], lang: str) -> TranscribeResult:
         segments = _words_to_segments(words)
         if not segments and text.strip():
             segments = [Segment(0.0, 0.0, text)]
@@ -169,3 +306,101 @@ class ElevenLabsTranscribeService:
             segments=segments,
             srt_content=srt,
         )
+
+    # ── blocking API ───────────────────────────────────────────────────────
+    def _request(self, file_part: tuple[str, bytes, str], language: str) -> tuple[str, list[dict], str]:
+        """POST one file to Scribe; return ``(text, words, language)``."""
+        resp = request_with_retry(
+            "POST", ELEVENLABS_STT_URL, timeout=_TIMEOUT,
+            **self._request_kwargs(file_part, language),
+        )
+        resp.raise_for_status()
+        return _parse_response(resp.json())
+
+    def transcribe(self, audio: PcmAudio | str, language: str = "auto") -> TranscribeResult:
+        """Transcribe audio (shared PCM buffer or file path) and return structured results.
+
+        WAV recordings longer than ``chunk_seconds`` are split at pauses and
+        the pieces transcribed concurrently; word timestamps are shifted
+        back by each chunk's offset before segmenting.
+        """
+        path, audio = _open_audio(audio)
+        plans = self._plan(audio)
+        if plans is None:
+            text, words, lang = self._request(self._upload_payload(path, audio), language)
+        else:
+            workers = min(self._max_concurrency, len(plans))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="elevenlabs") as pool:
+                futures = [
+                    pool.submit(self._transcribe_range, audio, i, plan, language)
+                    for i, plan in enumerate(plans)
+                ]
+                results = [piece for f in futures for piece in f.result()]
+            text, words, lang = _merge_chunks(results)
+        return self._build_result(text, words, lang)
+
+    def _transcribe_range(
+        self, audio: PcmAudio, index: int, plan: ChunkPlan, language: str,
+    ) -> list[tuple[EncodedChunk, list[Segment], str]]:
+        """Encode and transcribe one planned chunk; words come back in absolute time."""
+        results = []
+        for chunk in encode_chunk(
+            audio, plan, self._upload_codec, ELEVENLABS_MAX_UPLOAD_BYTES, index,
+        ):
+            _text, words, lang = self._request(
+                (chunk.filename, chunk.data, chunk.content_type), language,
+            )
+            results.append((chunk, _shift_words(words, chunk.start), lang))
+        return results
+
+    # ── asyncio API ────────────────────────────────────────────────────────
+    async def _request_async(
+        self, file_part: tuple[str, bytes, str], language: str,
+    ) -> tuple[str, list[dict], str]:
+        resp = await arequest_with_retry(
+            "POST", ELEVENLABS_STT_URL, timeout=_ASYNC_TIMEOUT,
+            **self._request_kwargs(file_part, language),
+        )
+        resp.raise_for_status()
+        return _parse_response(resp.json())
+
+    async def transcribe_async(
+        self, audio: PcmAudio | str, language: str = "auto",
+    ) -> TranscribeResult:
+        """Async :meth:`transcribe`: requests are awaited, not run on threads.
+
+        Only the short ffmpeg encodes go to the default executor.
+        """
+        path, audio = _open_audio(audio)
+        plans = self._plan(audio)
+        if plans is None:
+            file_part = await asyncio.to_thread(self._upload_payload, path, audio)
+            text, words, lang = await self._request_async(file_part, language)
+        else:
+            limit = asyncio.Semaphore(self._max_concurrency)
+            pieces = await asyncio.gather(*(
+                self._transcribe_range_async(audio, i, plan, language, limit)
+                for i, plan in enumerate(plans)
+            ))
+            text, words, lang = _merge_chunks([p for piece in pieces for p in piece])
+        return self._build_result(text, words, lang)
+
+    async def _transcribe_range_async(
+        self,
+        audio: PcmAudio,
+        index: int,
+        plan: ChunkPlan,
+        language: str,
+        limit: asyncio.Semaphore,
+    ) -> list[tuple[EncodedChunk, list[Segment], str]]:
+        async with limit:
+            chunks = await asyncio.to_thread(
+                encode_chunk, audio, plan, self._upload_codec, ELEVENLABS_MAX_UPLOAD_BYTES, index,
+            )
+            results = []
+            for chunk in chunks:
+                _text, words, lang = await self._request_async(
+                    (chunk.filename, chunk.data, chunk.content_type), language,
+                )
+                results.append((chunk, _shift_words(words, chunk.start), lang))
+            return results
@@ -7,19 +7,68 @@ for each segment.  Supports both local file uploads and YouTube URLs.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import subprocess
 import time
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import TYPE_CHECKING
-
-if TYPE_CHECKING:
-    from app.config import Settings
+from typing import Any, Awaitable, Callable
+
+from app.config import get_settings
+from app.services.body_language_structured import (
+    BATCH_GENERATION_CONFIG,
+    BODY_LANGUAGE_BATCH_PROMPT_VERSION,
+    build_batch_prompt,
+    parse_batch_response,
+    render_observations,
+)
+from app.services.gemini_client import (
+    GeminiAPIError,
+    generate_text,
+    get_gemini_limiter,
+)
+from app.services.http_client import backoff_delay
+from app.services.keyframes import (
+    KEYFRAME_PREAMBLE,
+    KeyframeSampling,
+    extract_keyframes,
+    keyframe_parts,
+    thin_keyframes,
+)
+from app.services.rate_limit import AimdLimiter
+from app.services.result_cache import file_hash
+from app.services.result_store import GeminiFileRecord, get_result_store
+from app.services.session_stats import stats as session_stats
+from app.services.video_activity import fixed_segments
 
 logger = logging.getLogger(__name__)
 
 SEGMENT_DURATION = 180  # 3 minutes per segment
+# 429s are expected while the limiter probes for capacity; retry them
+# separately from the per-segment ``max_retries`` budget.
+_MAX_RATE_LIMIT_RETRIES = 8
+# Processing poll: first check after 1 s, then x1.5 per poll up to 10 s.
+_POLL_INITIAL_SECONDS = 1.0
+_POLL_BACKOFF = 1.5
+_POLL_MAX_SECONDS = 10.0
+# Give up on an upload that is still PROCESSING after this long.
+PROCESSING_TIMEOUT = 30 * 60
+
+# "video": upload the file via the File API; "keyframes": send locally
+# sampled frames inline (see app/services/keyframes.py).
+INPUT_MODES = ("video", "keyframes")
+# Concurrent ffmpeg keyframe extractions per run.
+_KEYFRAME_EXTRACT_CONCURRENCY = 4
+
+# Gemini deletes uploads after 48 h; do not reuse one about to expire.
+_FILE_REUSE_MARGIN = 2 * 60 * 60
+
+# One in-flight upload per (video, account); later callers reuse its result.
+_upload_locks: dict[tuple[str, str], asyncio.Lock] = {}
 
 BODY_LANGUAGE_PROMPT = """You are an expert in nonverbal communication and teaching pedagogy. \
 Analyze ONLY the segment from {start_ts} to {end_ts} of this teaching video.
@@ -52,107 +101,266 @@ Cover EVERY notable body language moment in this segment. Aim for at least one o
 15-30 seconds of video. Do not skip any part of this segment.
 """
 
+# Changes whenever the prompt text is edited; part of result-cache keys.
+BODY_LANGUAGE_PROMPT_VERSION = hashlib.sha256(BODY_LANGUAGE_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+COMBINED_REPORT_FILENAME = "00_full_body_language_report.md"
+
 
 def _fmt_ts(seconds: int) -> str:
     m, s = divmod(seconds, 60)
     return f"{m:02d}:{s:02d}"
 
 
-def _stream_gemini(
+def resolve_input_mode(input_mode: str | None) -> str:
+    """*input_mode*, or the ``gemini_input_mode`` setting; ValueError if unknown."""
+    mode = input_mode or get_settings().gemini_input_mode
+    if mode not in INPUT_MODES:
+        raise ValueError(
+            f"Unknown input_mode '{mode}'. Accepted: {', '.join(INPUT_MODES)}"
+        )
+    return mode
+
+
+def keyframe_sampling_from_settings() -> KeyframeSampling:
+    settings = get_settings()
+    return KeyframeSampling(fps=settings.gemini_keyframe_fps, width=settings.gemini_keyframe_width)
+
+
+@dataclass
+class SegmentAnalysis:
+    """Outcome of one analysed segment; *markdown* is its report section."""
+    segment: int
+    start: str
+    end: str
+    # Name of the segment's file when the report is saved.
+    file: str
+    chars: int
+    error: str | None
+    markdown: str
+    # Structured observations (batched mode only).
+    observations: list[dict] | None = None
+
+    def info(self) -> dict:
+        """The segment as ``{segment, start, end, chars, error}``."""
+        return {
+            "segment": self.segment,
+            "start": self.start,
+            "end": self.end,
+            "chars": self.chars,
+            "error": self.error,
+        }
+
+
+@dataclass
+class BodyLanguageReport:
+    """All segments of one run, in order; the combined report is built on demand."""
+    model: str
+    segments: list[SegmentAnalysis]
+    input_mode: str = "video"
+    keyframe_sampling: KeyframeSampling | None = None
+
+    @property
+    def failed(self) -> bool:
+        return any(s.error for s in self.segments)
+
+    @cached_property
+    def combined_report(self) -> str:
+        parts = [
+            "# Full Body Language Analysis Report\n\n",
+            f"**Model:** {self.model}\n\n",
+            f"**Segments:** {len(self.segments)}\n\n---\n\n",
+        ]
+        for seg in self.segments:
+            parts.append(seg.markdown)
+            parts.append("\n\n---\n\n")
+        return "".join(parts)
+
+    def save(self, output_dir: str) -> Path:
+        """Write every segment and the combined report to *output_dir*.
+
+        Returns the combined report's path.
+        """
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        for seg in self.segments:
+            (out / seg.file).write_text(seg.markdown, encoding="utf-8")
+        combined_path = out / COMBINED_REPORT_FILENAME
+        combined_path.write_text(self.combined_report, encoding="utf-8")
+        return combined_path
+
+
+async def _stream_gemini(
     api_key: str,
     model: str,
-    file_uri: str,
+    file_uri: str | None,
     prompt: str,
     start_sec: int | None = None,
     end_sec: int | None = None,
     max_time: int = 600,
+    generation_config: dict | None = None,
+    media_parts: list[dict] | None = None,
 ) -> str:
-    """Call Gemini via curl with streaming SSE and return assembled text."""
-    file_part: dict = {"file_data": {"mime_type": "video/mp4", "file_uri": file_uri}}
-    if start_sec is not None and end_sec is not None:
-        file_part["video_metadata"] = {
-            "start_offset": f"{start_sec}s",
-            "end_offset": f"{end_sec}s",
-        }
-
-    payload = {"contents": [{"parts": [file_part, {"text": prompt}]}]}
-
-    url = (
-        f"https://generativelanguage.googleapis.com/v1beta/"
-        f"models/{model}:streamGenerateContent?alt=sse"
-    )
-
-    payload_file = "/tmp/gemini_bl_payload.json"
-    with open(payload_file, "w") as f:
-        json.dump(payload, f)
-
-    result = subprocess.run(
-        [
-            "curl", "-s", "--max-time", str(max_time), url,
-            "-H", f"x-goog-api-key: {api_key}",
-            "-H", "Content-Type: application/json",
-            "-X", "POST", "-d", f"@{payload_file}",
-        ],
-        capture_output=True,
-        text=True,
-    )
-
-    if not result.stdout.strip():
-        raise RuntimeError(
-            f"Empty Gemini response (curl exit: {result.returncode})"
-        )
+    """Call Gemini with streaming SSE and return the assembled text.
 
-    text_parts: list[str] = []
-    for line in result.stdout.split("\n"):
-        line = line.strip()
-        if not line.startswith("data: "):
-            continue
-        try:
-            chunk = json.loads(line[6:])
-        except json.JSONDecodeError:
-            continue
-        if "error" in chunk:
-            raise RuntimeError(f"Gemini API error: {chunk['error']['message']}")
-        for cand in chunk.get("candidates", []):
-            for part in cand.get("content", {}).get("parts", []):
-                if "text" in part:
-                    text_parts.append(part["text"])
-
-    if not text_parts:
-        raise RuntimeError(f"No text in Gemini response: {result.stdout[:300]}")
+    *media_parts* (e.g. inline keyframes) replace the ``file_uri`` part.
+    *generation_config* is sent as ``generationConfig`` (e.g. a JSON schema).
+    """
+    if media_parts is None:
+        file_part: dict = {"file_data": {"mime_type": "video/mp4", "file_uri": file_uri}}
+        if start_sec is not None and end_sec is not None:
+            file_part["video_metadata"] = {
+                "start_offset": f"{start_sec}s",
+                "end_offset": f"{end_sec}s",
+            }
+        media_parts = [file_part]
 
-    return "".join(text_parts)
+    payload: dict = {"contents": [{"parts": [*media_parts, {"text": prompt}]}]}
+    if generation_config:
+        payload["generationConfig"] = generation_config
 
+    return await generate_text(api_key, model, payload, max_time=max_time)
 
-def upload_video_to_gemini(api_key: str, video_path: str) -> str:
-    """Upload a local video file via the Gemini File API and return the file URI.
 
-    Blocks until the file reaches ACTIVE state.
-    """
+def _gemini_client(api_key: str):
     from google import genai
     from google.genai.types import HttpOptions
 
-    client = genai.Client(
+    return genai.Client(
         api_key=api_key,
         http_options=HttpOptions(timeout=600_000),
     )
 
-    logger.info("Uploading %s to Gemini File API...", video_path)
-    video_file = client.files.upload(file=video_path)
-    logger.info("Upload complete: %s  state=%s", video_file.uri, video_file.state)
 
+def _account(api_key: str) -> str:
+    """Fingerprint of *api_key*; uploads are only visible to their own project."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _expiry(video_file) -> float | None:
+    expires = getattr(video_file, "expiration_time", None)
+    return expires.timestamp() if expires is not None else None
+
+
+async def _wait_until_active(client, video_file, timeout: float):
+    """Poll until *video_file* leaves PROCESSING; raise RuntimeError past *timeout*.
+
+    Polls quickly at first (short clips are often ready within seconds),
+    then backs off exponentially up to ``_POLL_MAX_SECONDS``.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    interval = _POLL_INITIAL_SECONDS
     while video_file.state.name == "PROCESSING":
-        logger.info("  Waiting for processing...")
-        time.sleep(10)
-        video_file = client.files.get(name=video_file.name)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(
+                f"Gemini video processing did not finish within {timeout:.0f}s"
+            )
+        await asyncio.sleep(min(interval, remaining))
+        interval = min(_POLL_MAX_SECONDS, interval * _POLL_BACKOFF)
+        video_file = await client.aio.files.get(name=video_file.name)
+        logger.info("  Processing... %.1fs elapsed", time.monotonic() - started)
 
     if video_file.state.name == "FAILED":
         raise RuntimeError("Gemini video processing failed")
+    return video_file
+
+
+async def _reuse_uploaded(client, record: GeminiFileRecord):
+    """Return the recorded upload if Gemini still has it usable, else None."""
+    if record.expires_at is not None and record.expires_at - time.time() < _FILE_REUSE_MARGIN:
+        return None
+    try:
+        video_file = await client.aio.files.get(name=record.name)
+    except Exception as exc:  # deleted, expired or another project's key
+        logger.info("Recorded Gemini file %s not usable: %s", record.name, exc)
+        return None
+    if video_file.state.name not in ("ACTIVE", "PROCESSING"):
+        return None
+    return video_file
+
+
+async def upload_video_to_gemini(
+    api_key: str,
+    video_path: str,
+    media_hash: str | None = None,
+    processing_timeout: float = PROCESSING_TIMEOUT,
+    on_processing_wait: Callable[[float], None] | None = None,
+) -> str:
+    """Upload a local video file via the Gemini File API and return the file URI.
+
+    Uploads are recorded in the result store by video content hash (computed
+    here when *media_hash* is not given); an upload that is still ACTIVE (or
+    PROCESSING) on Gemini is reused instead of sending the file again.
+    Concurrent calls for the same video share one upload.
+
+    Waits (without holding a thread) until the file reaches ACTIVE state,
+    at most *processing_timeout* seconds.  For a new upload that had to be
+    processed, the wait is added to the dashboard's session stats and, if
+    given, passed to *on_processing_wait*.
+    """
+    if media_hash is None:
+        media_hash = await asyncio.to_thread(file_hash, video_path)
+    account = _account(api_key)
+    store = get_result_store()
+    client = _gemini_client(api_key)
+
+    lock = _upload_locks.setdefault((media_hash, account), asyncio.Lock())
+    async with lock:
+        record = await asyncio.to_thread(store.get_gemini_file, media_hash, account)
+        video_file = await _reuse_uploaded(client, record) if record else None
+        uploaded = video_file is None
+        if not uploaded:
+            logger.info("Reusing Gemini upload %s for %s (state=%s)",
+                        video_file.uri, media_hash[:12], video_file.state.name)
+        else:
+            if record:
+                await asyncio.to_thread(store.delete_gemini_file, media_hash, account)
+            logger.info("Uploading %s to Gemini File API...", video_path)
+            video_file = await client.aio.files.upload(file=video_path)
+            logger.info("Upload complete: %s  state=%s", video_file.uri, video_file.state)
+
+        record = GeminiFileRecord(
+            media_hash=media_hash, account=account, name=video_file.name,
+            uri=video_file.uri, state=video_file.state.name, expires_at=_expiry(video_file),
+        )
+        await asyncio.to_thread(store.save_gemini_file, record)
+
+        # Only a fresh upload still in PROCESSING says how long processing takes.
+        measure_wait = uploaded and video_file.state.name == "PROCESSING"
+        wait_started = time.monotonic()
+        try:
+            video_file = await _wait_until_active(client, video_file, processing_timeout)
+        except RuntimeError:
+            await asyncio.to_thread(store.delete_gemini_file, media_hash, account)
+            raise
+        if measure_wait:
+            waited = time.monotonic() - wait_started
+            session_stats.record_gemini_processing_wait(waited)
+            if on_processing_wait is not None:
+                on_processing_wait(waited)
+            logger.info("Gemini processing took %.1fs", waited)
+        record.state = video_file.state.name
+        await asyncio.to_thread(store.save_gemini_file, record)
 
     logger.info("Video ready: %s", video_file.uri)
     return video_file.uri
 
 
+async def find_uploaded_video(api_key: str, media_hash: str) -> str | None:
+    """Return the URI of a still-usable upload of *media_hash*, or None."""
+    account = _account(api_key)
+    record = await asyncio.to_thread(get_result_store().get_gemini_file, media_hash, account)
+    if record is None:
+        return None
+    video_file = await _reuse_uploaded(_gemini_client(api_key), record)
+    if video_file is None or video_file.state.name != "ACTIVE":
+        return None
+    return video_file.uri
+
+
 def download_youtube_video(url: str, output_dir: str) -> str:
     """Download a YouTube video at 480p via yt-dlp and return the local path."""
     import yt_dlp
@@ -196,93 +404,318 @@ def get_video_duration(video_path: str) -> int:
         return 36 * 60  # fallback
 
 
-def analyze_body_language(
+async def _generate_with_retries(
     api_key: str,
     model: str,
-    file_uri: str,
-    total_duration: int,
-    output_dir: str,
-    segment_duration: int = SEGMENT_DURATION,
-    max_retries: int = 2,
-) -> list[dict]:
-    """Run segmented body-language analysis and save results.
+    file_uri: str | None,
+    prompt: str,
+    start_sec: int,
+    end_sec: int,
+    label: str,
+    limiter: AimdLimiter,
+    max_retries: int,
+    generation_config: dict | None = None,
+    parse: Callable[[str], Any] | None = None,
+    media: Callable[[int, int], Awaitable[list[dict]]] | None = None,
+) -> tuple[Any, str | None]:
+    """Run one request under *limiter*; return ``(result, error)``.
+
+    *result* is the response text, or ``parse(text)`` if *parse* is given;
+    a ValueError from *parse* counts as a failed attempt.  Rate-limited
+    attempts feed the limiter and are retried (up to
+    ``_MAX_RATE_LIMIT_RETRIES``) without using up *max_retries*.
+
+    *media* (e.g. keyframe extraction) builds the content parts that replace
+    *file_uri*.  It runs inside the limiter slot, once per attempt, so only
+    the requests in flight hold their inline data; a RuntimeError from it
+    fails the request without retrying.
+    """
+    error = None
+    attempt = rate_limited = 0
+    while attempt < max_retries:
+        async with limiter.slot() as slot:
+            logger.info("%s Analyzing %s - %s (concurrency %d)",
+                        label, _fmt_ts(start_sec), _fmt_ts(end_sec), limiter.limit)
+            media_parts = None
+            if media is not None:
+                try:
+                    media_parts = await media(start_sec, end_sec)
+                except RuntimeError as exc:
+                    return None, str(exc)
+            try:
+                text = await _stream_gemini(
+                    api_key, model, file_uri, prompt, start_sec, end_sec,
+                    generation_config=generation_config, media_parts=media_parts,
+                )
+                limiter.on_success(slot)
+                return (parse(text) if parse is not None else text), None
+            except GeminiAPIError as exc:
+                error = str(exc)
+                if exc.rate_limited and rate_limited < _MAX_RATE_LIMIT_RETRIES:
+                    limiter.on_rate_limited(slot)
+                    rate_limited += 1
+                else:
+                    attempt += 1
+            except (RuntimeError, ValueError) as exc:
+                error = str(exc)
+                attempt += 1
+        logger.warning(
+            "  %s attempt failed (%d/%d, %d rate-limited): %s",
+            label, attempt, max_retries, rate_limited, error,
+        )
+        if attempt < max_retries:
+            await asyncio.sleep(backoff_delay(attempt + rate_limited))
+    return None, error
+
+
+async def _analyze_segment(
+    api_key: str,
+    model: str,
+    file_uri: str | None,
+    seg_num: int,
+    total: int,
+    start_sec: int,
+    end_sec: int,
+    limiter: AimdLimiter,
+    max_retries: int,
+    media: Callable[[int, int], Awaitable[list[dict]]] | None = None,
+) -> tuple[str | None, str | None]:
+    """Analyze one segment as free-form markdown; return ``(text, error)``."""
+    prompt = BODY_LANGUAGE_PROMPT.format(start_ts=_fmt_ts(start_sec), end_ts=_fmt_ts(end_sec))
+    return await _generate_with_retries(
+        api_key, model, file_uri, prompt, start_sec, end_sec,
+        f"[{seg_num}/{total}]", limiter, max_retries, media=media,
+    )
+
 
-    Returns a list of dicts: {segment, start, end, file, chars, error}.
+async def _analyze_batch(
+    api_key: str,
+    model: str,
+    file_uri: str | None,
+    group: list[tuple[int, int, int]],
+    total: int,
+    limiter: AimdLimiter,
+    max_retries: int,
+    media: Callable[[int, int], Awaitable[list[dict]]] | None = None,
+) -> tuple[dict[tuple[str, str], list[dict]] | None, str | None]:
+    """Analyze consecutive segments in one JSON request; return ``(observations, error)``.
+
+    *observations* maps each ``(start_ts, end_ts)`` window the model
+    answered to its observation dicts.
     """
-    out = Path(output_dir)
-    out.mkdir(parents=True, exist_ok=True)
+    windows = [(_fmt_ts(start), _fmt_ts(end)) for _, start, end in group]
+    first, last = group[0][0], group[-1][0]
+    return await _generate_with_retries(
+        api_key, model, file_uri, build_batch_prompt(windows), group[0][1], group[-1][2],
+        f"[{first}-{last}/{total}]", limiter, max_retries,
+        generation_config=BATCH_GENERATION_CONFIG,
+        parse=lambda text: parse_batch_response(text, windows),
+        media=media,
+    )
 
-    segments: list[tuple[int, int, int]] = []
-    start = 0
-    seg_num = 1
-    while start < total_duration:
-        end = min(start + segment_duration, total_duration)
-        segments.append((seg_num, start, end))
-        start = end
-        seg_num += 1
 
-    results: list[dict] = []
+def _batch_groups(
+    segments: list[tuple[int, int, int]], size: int,
+) -> list[list[tuple[int, int, int]]]:
+    """Split *segments* into runs of up to *size* contiguous segments."""
+    groups: list[list[tuple[int, int, int]]] = []
+    for seg in segments:
+        if groups and len(groups[-1]) < size and groups[-1][-1][2] == seg[1]:
+            groups[-1].append(seg)
+        else:
+            groups.append([seg])
+    return groups
 
-    for seg_num, start_sec, end_sec in segments:
+
+async def analyze_body_language(
+    api_key: str,
+    model: str,
+    file_uri: str | None,
+    total_duration: int,
+    output_dir: str | None = None,
+    segment_duration: int = SEGMENT_DURATION,
+    max_retries: int = 2,
+    on_segment: Callable[[dict, str], None] | None = None,
+    media_hash: str | None = None,
+    spans: list[tuple[int, int]] | None = None,
+    batch_windows: int | None = None,
+    keyframe_video: str | None = None,
+    keyframe_sampling: KeyframeSampling | None = None,
+) -> BodyLanguageReport:
+    """Run segmented body-language analysis and return the report.
+
+    Segments run concurrently under the process-wide AIMD limiter for
+    *model* (see ``app/services/rate_limit.py``), so the request rate
+    adapts to Gemini's rate limits across all jobs.
+
+    With *media_hash* every successful segment is checkpointed in the
+    result store under (video hash, model, prompt version, start, end), and
+    segments already checkpointed there are not sent to Gemini again — so
+    calling this again for the same video resumes a run with failed
+    segments, and a different *segment_duration* still reuses every
+    segment whose time range matches exactly.
+
+    *spans* overrides the fixed *segment_duration* windows with explicit
+    ``(start, end)`` ranges, e.g. from
+    :func:`app.services.video_activity.plan_adaptive_segments`.
+
+    With *batch_windows* > 1 (default: the ``gemini_batch_windows``
+    setting) up to that many contiguous segments share one request that
+    returns schema-constrained JSON (see
+    ``app/services/body_language_structured.py``); each segment then also
+    carries its structured ``observations``.  Batched and free-form runs
+    keep separate checkpoints.
+
+    With *keyframe_video* (a local path) no uploaded file is used: each
+    request carries frames sampled from that video per *keyframe_sampling*
+    (default: the ``gemini_keyframe_*`` settings) inline, and *file_uri*
+    may be None.  Frames are extracted only once a request holds its
+    limiter slot, and windows whose frames exceed
+    ``gemini_keyframe_max_bytes`` are sent at a lower effective frame rate.
+
+    The report is built in memory, segments in order.  With *output_dir*
+    it is also written there (one markdown file per segment plus
+    ``COMBINED_REPORT_FILENAME``).  If given, *on_segment* is called with
+    each segment's info dict and markdown as soon as that segment is
+    finished (which may be out of order).
+    """
+    if spans is None:
+        spans = fixed_segments(total_duration, segment_duration)
+    segments = [(seg_num, start, end) for seg_num, (start, end) in enumerate(spans, 1)]
+
+    settings = get_settings()
+    if batch_windows is None:
+        batch_windows = settings.gemini_batch_windows
+    batched = batch_windows > 1
+    prompt_version = BODY_LANGUAGE_BATCH_PROMPT_VERSION if batched else BODY_LANGUAGE_PROMPT_VERSION
+    if keyframe_video is not None:
+        keyframe_sampling = keyframe_sampling or keyframe_sampling_from_settings()
+        prompt_version = hashlib.sha256(
+            f"{prompt_version}:{keyframe_sampling.signature}".encode("utf-8")
+        ).hexdigest()[:12]
+
+    store = get_result_store()
+    checkpoints: dict[tuple[int, int], str] = {}
+    if media_hash:
+        checkpoints = await asyncio.to_thread(
+            store.get_segment_checkpoints, media_hash, model, prompt_version,
+        )
+        reused = sum((s, e) in checkpoints for _, s, e in segments)
+        if reused:
+            logger.info("Resuming from %d/%d checkpointed segments", reused, len(segments))
+    pending = [seg for seg in segments if (seg[1], seg[2]) not in checkpoints]
+
+    limiter = get_gemini_limiter(model)
+
+    extract_slots = asyncio.Semaphore(_KEYFRAME_EXTRACT_CONCURRENCY)
+    max_inline_bytes = settings.gemini_keyframe_max_bytes
+
+    async def keyframe_media(start_sec: int, end_sec: int) -> list[dict]:
+        """Inline keyframe parts for ``[start_sec, end_sec)``, thinned to fit the cap."""
+        async with extract_slots:
+            frames = await asyncio.to_thread(
+                extract_keyframes, keyframe_video, start_sec, end_sec, keyframe_sampling,
+            )
+        frames, step = thin_keyframes(frames, max_inline_bytes)
+        if step > 1:
+            logger.warning(
+                "Keyframes for %s - %s exceed %.1f MB; keeping 1 frame in %d",
+                _fmt_ts(start_sec), _fmt_ts(end_sec), max_inline_bytes / 1e6, step,
+            )
+        preamble = KEYFRAME_PREAMBLE.format(interval=step / keyframe_sampling.fps)
+        return [{"text": preamble}, *keyframe_parts(frames)]
+
+    media = keyframe_media if keyframe_video is not None else None
+
+    def finish(
+        seg_num: int,
+        start_sec: int,
+        end_sec: int,
+        text: str | None,
+        error: str | None,
+        observations: list[dict] | None = None,
+    ) -> SegmentAnalysis:
         start_ts = _fmt_ts(start_sec)
         end_ts = _fmt_ts(end_sec)
         filename = f"segment_{seg_num:02d}_{start_ts.replace(':', '')}_{end_ts.replace(':', '')}.md"
-        filepath = out / filename
-
-        logger.info("[%d/%d] Analyzing %s - %s", seg_num, len(segments), start_ts, end_ts)
-
-        prompt = BODY_LANGUAGE_PROMPT.format(start_ts=start_ts, end_ts=end_ts)
+        markdown = f"# Segment {seg_num}: {start_ts} - {end_ts}\n\n"
+        markdown += text if text else f"*Analysis failed: {error}*\n"
+
+        result = SegmentAnalysis(
+            segment=seg_num,
+            start=start_ts,
+            end=end_ts,
+            file=filename,
+            chars=len(text) if text else 0,
+            error=error if not text else None,
+            markdown=markdown,
+            observations=observations,
+        )
+        logger.info("  → segment %d (%d chars)", seg_num, result.chars)
+        if on_segment is not None:
+            on_segment(result.info(), markdown)
+        return result
+
+    async def checkpoint(start_sec: int, end_sec: int, text: str) -> None:
+        if media_hash:
+            await asyncio.to_thread(
+                store.save_segment_checkpoint, media_hash, model,
+                prompt_version, start_sec, end_sec, text,
+            )
+
+    def from_checkpoint(seg_num: int, start_sec: int, end_sec: int) -> SegmentAnalysis:
+        saved = checkpoints[(start_sec, end_sec)]
+        if not batched:
+            return finish(seg_num, start_sec, end_sec, saved, None)
+        observations = json.loads(saved)
+        return finish(seg_num, start_sec, end_sec, render_observations(observations), None,
+                      observations)
+
+    async def run(seg_num: int, start_sec: int, end_sec: int) -> list[SegmentAnalysis]:
+        text, error = await _analyze_segment(
+            api_key, model, file_uri, seg_num, len(segments), start_sec, end_sec,
+            limiter, max_retries, media,
+        )
+        if text:
+            await checkpoint(start_sec, end_sec, text)
+        return [finish(seg_num, start_sec, end_sec, text, error)]
 
-        text = None
-        error = None
-        for attempt in range(1, max_retries + 1):
-            try:
-                text = _stream_gemini(
-                    api_key, model, file_uri, prompt, start_sec, end_sec
-                )
-                break
-            except RuntimeError as exc:
-                error = str(exc)
-                logger.warning(
-                    "  Attempt %d/%d failed: %s", attempt, max_retries, error
-                )
-                if attempt < max_retries:
-                    time.sleep(15)
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"# Segment {seg_num}: {start_ts} - {end_ts}\n\n")
-            if text:
-                f.write(text)
-            else:
-                f.write(f"*Analysis failed: {error}*\n")
-
-        info = {
-            "segment": seg_num,
-            "start": start_ts,
-            "end": end_ts,
-            "file": filename,
-            "chars": len(text) if text else 0,
-            "error": error if not text else None,
-        }
-        results.append(info)
-        logger.info("  → %s (%d chars)", filename, info["chars"])
-
-        time.sleep(3)
-
-    # Combined report
-    combined_path = out / "00_full_body_language_report.md"
-    with open(combined_path, "w", encoding="utf-8") as f:
-        f.write("# Full Body Language Analysis Report\n\n")
-        f.write(f"**Model:** {model}\n\n")
-        f.write(f"**Segments:** {len(segments)}\n\n---\n\n")
-        for seg_num, start_sec, end_sec in segments:
-            start_ts = _fmt_ts(start_sec)
-            end_ts = _fmt_ts(end_sec)
-            filename = f"segment_{seg_num:02d}_{start_ts.replace(':', '')}_{end_ts.replace(':', '')}.md"
-            seg_path = out / filename
-            if seg_path.exists():
-                f.write(seg_path.read_text(encoding="utf-8"))
-                f.write("\n\n---\n\n")
-
-    logger.info("Combined report → %s", combined_path)
-    return results
+    async def run_batch(group: list[tuple[int, int, int]]) -> list[SegmentAnalysis]:
+        answered, error = await _analyze_batch(
+            api_key, model, file_uri, group, len(segments), limiter, max_retries, media,
+        )
+        results = []
+        for seg_num, start_sec, end_sec in group:
+            observations = (answered or {}).get((_fmt_ts(start_sec), _fmt_ts(end_sec)))
+            if observations is None:
+                results.append(finish(
+                    seg_num, start_sec, end_sec, None,
+                    error or "Window missing from batched response",
+                ))
+                continue
+            await checkpoint(start_sec, end_sec, json.dumps(observations, ensure_ascii=False))
+            results.append(finish(
+                seg_num, start_sec, end_sec, render_observations(observations), None,
+                observations,
+            ))
+        return results
+
+    results = [from_checkpoint(*seg) for seg in segments if (seg[1], seg[2]) in checkpoints]
+    if batched:
+        tasks = [run_batch(group) for group in _batch_groups(pending, batch_windows)]
+    else:
+        tasks = [run(*seg) for seg in pending]
+    done = await asyncio.gather(*tasks)
+    results.extend(r for batch in done for r in batch)
+    results.sort(key=lambda r: r.segment)
+
+    report = BodyLanguageReport(
+        model=model,
+        segments=results,
+        input_mode="keyframes" if keyframe_video is not None else "video",
+        keyframe_sampling=keyframe_sampling if keyframe_video is not None else None,
+    )
+    if output_dir is not None:
+        combined_path = await asyncio.to_thread(report.save, output_dir)
+        logger.info("Combined report → %s", combined_path)
+    return report
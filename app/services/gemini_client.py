@@ -0,0 +1,155 @@
+"""In-process streaming client for the Gemini ``streamGenerateContent`` API.
+
+Replaces the old ``curl`` subprocess + ``/tmp`` payload file approach:
+
+* the JSON payload is sent straight from memory, so concurrent requests
+  cannot overwrite each other's payload;
+* requests share the pooled ``httpx.AsyncClient`` from ``http_client``
+  (keep-alive, TLS session reuse, no fork/exec per call);
+* the SSE stream is parsed event by event as it arrives instead of being
+  buffered whole and split afterwards.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from functools import lru_cache
+from typing import AsyncIterator
+
+import httpx
+
+from app.config import get_settings
+from app.services.http_client import get_async_http_client, provider_metrics
+from app.services.rate_limit import AimdLimiter
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+
+class GeminiAPIError(RuntimeError):
+    """Error reported by the Gemini API (HTTP status or in-stream error)."""
+
+    def __init__(self, message: str, code: int | None = None, status: str | None = None) -> None:
+        super().__init__(f"Gemini API error: {message}")
+        self.code = code
+        self.status = status
+
+    @property
+    def rate_limited(self) -> bool:
+        return self.code == 429 or self.status == "RESOURCE_EXHAUSTED"
+
+
+@lru_cache
+def get_gemini_limiter(model: str) -> AimdLimiter:
+    """Process-wide AIMD limiter for *model* (quotas are per model)."""
+    settings = get_settings()
+    return AimdLimiter(
+        f"gemini:{model}",
+        initial=settings.gemini_initial_concurrency,
+        maximum=settings.gemini_max_concurrency,
+    )
+
+
+def _api_error(body: dict, http_code: int | None = None) -> GeminiAPIError:
+    err = body.get("error") or {}
+    return GeminiAPIError(
+        err.get("message") or f"HTTP {http_code}",
+        code=err.get("code") or http_code,
+        status=err.get("status"),
+    )
+
+
+async def _iter_sse_events(resp: httpx.Response) -> AsyncIterator[dict]:
+    """Yield each SSE event's JSON ``data`` as soon as the event is complete."""
+    data_lines: list[str] = []
+    async for line in resp.aiter_lines():
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+            continue
+        if line or not data_lines:
+            continue  # comments / other fields, or a stray blank line
+        payload, data_lines = "\n".join(data_lines), []
+        try:
+            yield json.loads(payload)
+        except json.JSONDecodeError:
+            logger.debug("Skipping malformed SSE event: %s", payload[:200])
+    if data_lines:
+        try:
+            yield json.loads("\n".join(data_lines))
+        except json.JSONDecodeError:
+            pass
+
+
+async def stream_text(
+    api_key: str,
+    model: str,
+    payload: dict,
+    *,
+    read_timeout: float = 120.0,
+) -> AsyncIterator[str]:
+    """Stream text parts of a ``streamGenerateContent`` call as they arrive.
+
+    Raises :class:`GeminiAPIError` for HTTP errors and in-stream errors.
+    """
+    url = f"{GEMINI_API_BASE}/models/{model}:streamGenerateContent?alt=sse"
+    client = get_async_http_client()
+    metrics = provider_metrics("gemini")
+    started = time.monotonic()
+    ok = False
+    try:
+        async with client.stream(
+            "POST", url,
+            json=payload,
+            headers={"x-goog-api-key": api_key},
+            timeout=httpx.Timeout(read_timeout, connect=10.0, pool=None),
+        ) as resp:
+            if resp.status_code != 200:
+                raw = await resp.aread()
+                try:
+                    body = json.loads(raw)
+                except json.JSONDecodeError:
+                    body = {"error": {"message": raw[:300].decode("utf-8", errors="replace")}}
+                raise _api_error(body, resp.status_code)
+
+            async for event in _iter_sse_events(resp):
+                if "error" in event:
+                    raise _api_error(event)
+                for cand in event.get("candidates", []):
+                    for part in cand.get("content", {}).get("parts", []):
+                        if "text" in part:
+                            yield part["text"]
+        ok = True
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"Gemini request failed: {exc.__class__.__name__}: {exc}") from exc
+    finally:
+        metrics.record_call(time.monotonic() - started, ok=ok)
+
+
+async def generate_text(
+    api_key: str,
+    model: str,
+    payload: dict,
+    *,
+    max_time: float = 600,
+) -> str:
+    """Run a streamed generation to completion and return the assembled text.
+
+    *max_time* bounds the whole call, like curl's ``--max-time`` did.
+    """
+    text_parts: list[str] = []
+
+    async def _collect() -> None:
+        async for text in stream_text(api_key, model, payload):
+            text_parts.append(text)
+
+    try:
+        await asyncio.wait_for(_collect(), timeout=max_time)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"Gemini request timed out after {max_time:g}s") from None
+
+    if not text_parts:
+        raise RuntimeError("No text in Gemini response")
+    return "".join(text_parts)
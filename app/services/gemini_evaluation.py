@@ -6,11 +6,12 @@ the standardised teaching-performance rubric.
 """
 from __future__ import annotations
 
-import json
+import hashlib
 import logging
-import subprocess
 from pathlib import Path
 
+from app.services.gemini_client import generate_text
+
 logger = logging.getLogger(__name__)
 
 _RUBRIC_PATH = (
@@ -28,7 +29,12 @@ def _load_rubric() -> str:
     return _rubric_cache
 
 
-def evaluate_with_gemini(
+def rubric_version() -> str:
+    """Short hash of the rubric prompt; part of result-cache keys."""
+    return hashlib.sha256(_load_rubric().encode("utf-8")).hexdigest()[:12]
+
+
+async def evaluate_with_gemini(
     api_key: str,
     model: str,
     transcript: str,
@@ -65,50 +71,6 @@ def evaluate_with_gemini(
         },
     }
 
-    url = (
-        f"https://generativelanguage.googleapis.com/v1beta/"
-        f"models/{model}:streamGenerateContent?alt=sse"
-    )
-
-    payload_file = "/tmp/gemini_eval_payload.json"
-    with open(payload_file, "w") as f:
-        json.dump(payload, f)
-
-    result = subprocess.run(
-        [
-            "curl", "-s", "--max-time", str(max_time), url,
-            "-H", f"x-goog-api-key: {api_key}",
-            "-H", "Content-Type: application/json",
-            "-X", "POST", "-d", f"@{payload_file}",
-        ],
-        capture_output=True,
-        text=True,
-    )
-
-    if not result.stdout.strip():
-        raise RuntimeError(
-            f"Empty Gemini response (curl exit: {result.returncode})"
-        )
-
-    text_parts: list[str] = []
-    for line in result.stdout.split("\n"):
-        line = line.strip()
-        if not line.startswith("data: "):
-            continue
-        try:
-            chunk = json.loads(line[6:])
-        except json.JSONDecodeError:
-            continue
-        if "error" in chunk:
-            raise RuntimeError(f"Gemini API error: {chunk['error']['message']}")
-        for cand in chunk.get("candidates", []):
-            for part in cand.get("content", {}).get("parts", []):
-                if "text" in part:
-                    text_parts.append(part["text"])
-
-    if not text_parts:
-        raise RuntimeError(f"No text in Gemini response: {result.stdout[:300]}")
-
-    evaluation = "".join(text_parts)
+    evaluation = await generate_text(api_key, model, payload, max_time=max_time)
     logger.info("Gemini evaluation complete: %d chars", len(evaluation))
     return evaluation
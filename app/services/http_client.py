@@ -0,0 +1,258 @@
+"""Shared HTTP plumbing for provider APIs: pooled session, retries, metrics.
+
+Provider clients used to call a bare ``requests.post`` per request: a new
+TCP + TLS handshake every time and no retry, so one transient 5xx failed a
+whole analysis.  This module provides
+
+* :func:`get_http_session` — one process-wide ``requests.Session`` with a
+  keep-alive connection pool;
+* :func:`request_with_retry` — bounded retries with full-jitter exponential
+  backoff for 429/5xx and connection errors, honouring ``Retry-After``;
+* :func:`get_async_http_client` / :func:`arequest_with_retry` — the same
+  for asyncio code: an ``httpx.AsyncClient`` pool, so an in-flight provider
+  call is a coroutine rather than a blocked executor thread;
+* :func:`provider_metrics` — per-provider call, failure, retry and latency
+  counters, shown on ``GET /api/dashboard``.
+"""
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+_POOL_SIZE = 16
+# Async connections are cheap; concurrent jobs share this pool.
+_ASYNC_MAX_CONNECTIONS = 64
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_MAX_SECONDS = 30.0
+# Do not sleep longer than this even if the server asks for it.
+_RETRY_AFTER_MAX_SECONDS = 120.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Metrics
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class ProviderMetrics:
+    """Counters for one provider; safe to update from executor threads."""
+
+    calls: int = 0
+    failures: int = 0
+    retries: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_call(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def snapshot(self) -> dict[str, float | int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "retries": self.retries,
+                "avg_latency_ms": round(1000 * self.total_latency / self.calls, 1)
+                if self.calls else 0.0,
+                "max_latency_ms": round(1000 * self.max_latency, 1),
+            }
+
+
+_metrics: dict[str, ProviderMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def provider_metrics(provider: str) -> ProviderMetrics:
+    """Return (creating on first use) the counters for *provider*."""
+    with _metrics_lock:
+        return _metrics.setdefault(provider, ProviderMetrics())
+
+
+def all_provider_metrics() -> dict[str, dict[str, float | int]]:
+    with _metrics_lock:
+        items = list(_metrics.items())
+    return {name: m.snapshot() for name, m in items}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Retry policy
+# ─────────────────────────────────────────────────────────────────────────────
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Delay before retry number *attempt* (0-based).
+
+    The server's ``Retry-After`` wins when given; otherwise full-jitter
+    exponential backoff, so parallel callers do not retry in lock-step.
+    """
+    if retry_after is not None:
+        return min(retry_after, _RETRY_AFTER_MAX_SECONDS)
+    return random.uniform(0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Session
+# ─────────────────────────────────────────────────────────────────────────────
+
+@lru_cache
+def get_http_session() -> requests.Session:
+    """Process-wide session; connections and TLS sessions are reused per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def request_with_retry(
+    method: str,
+    url: str,
+    *,
+    provider: str,
+    max_retries: int = 3,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send a request on the shared session, retrying transient failures.
+
+    Retries connection errors, timeouts and ``RETRYABLE_STATUS`` responses
+    up to *max_retries* times.  The final response is returned as-is (the
+    caller decides about ``raise_for_status``); the final connection error
+    is re-raised.  Request bodies must be re-sendable (bytes, not open files).
+    """
+    session = get_http_session()
+    metrics = provider_metrics(provider)
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        try:
+            resp = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            metrics.record_call(time.monotonic() - started, ok=False)
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning("%s request failed (%s) — retry %d in %.1fs",
+                           provider, exc.__class__.__name__, attempt + 1, delay)
+        else:
+            ok = resp.status_code not in RETRYABLE_STATUS
+            metrics.record_call(time.monotonic() - started, ok=ok and resp.ok)
+            if ok or attempt >= max_retries:
+                return resp
+            delay = backoff_delay(attempt, parse_retry_after(resp.headers.get("Retry-After")))
+            logger.warning("%s returned HTTP %d — retry %d in %.1fs",
+                           provider, resp.status_code, attempt + 1, delay)
+            resp.close()
+        metrics.record_retry()
+        time.sleep(delay)
+        attempt += 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Async client
+# ─────────────────────────────────────────────────────────────────────────────
+
+_async_client: httpx.AsyncClient | None = None
+_async_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Process-wide ``httpx.AsyncClient`` for the running event loop.
+
+    Callers pass their own per-request ``timeout``; waiting for a free pool
+    connection is unbounded so bursts queue instead of failing.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=_POOL_SIZE,
+            ),
+            timeout=httpx.Timeout(60.0, pool=None),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_http_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+async def arequest_with_retry(
+    method: str,
+    url: str,
+    *,
+    provider: str,
+    max_retries: int = 3,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Async :func:`request_with_retry` on the shared ``httpx.AsyncClient``."""
+    client = get_async_http_client()
+    metrics = provider_metrics(provider)
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError as exc:
+            metrics.record_call(time.monotonic() - started, ok=False)
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning("%s request failed (%s) — retry %d in %.1fs",
+                           provider, exc.__class__.__name__, attempt + 1, delay)
+        else:
+            ok = resp.status_code not in RETRYABLE_STATUS
+            metrics.record_call(time.monotonic() - started, ok=ok and resp.is_success)
+            if ok or attempt >= max_retries:
+                return resp
+            delay = backoff_delay(attempt, parse_retry_after(resp.headers.get("Retry-After")))
+            logger.warning("%s returned HTTP %d — retry %d in %.1fs",
+                           provider, resp.status_code, attempt + 1, delay)
+            await resp.aclose()
+        metrics.record_retry()
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,276 @@
+"""In-process job subsystem for long-running analyses.
+
+A full analysis can take over 30 minutes, far longer than clients and load
+balancers keep an HTTP request open.  Routes therefore submit a coroutine
+here and return a ``job_id`` straight away; clients poll
+``GET /api/jobs/{job_id}`` for status, per-stage progress and the result,
+or subscribe to ``GET /api/jobs/{job_id}/events`` (Server-Sent Events) to
+receive stage transitions, per-segment completions and partial results as
+they happen.
+
+Concurrency is bounded twice:
+
+* ``max_concurrent_jobs`` worker coroutines pull jobs off a bounded queue,
+  so at most that many pipelines run at once and excess submissions are
+  rejected instead of piling up.
+* Blocking stage work (ffmpeg, yt-dlp, SQLite) runs on a dedicated thread
+  pool owned by the manager, not the event loop's default executor, so
+  long jobs cannot starve ordinary request handlers of threads.
+
+Jobs live in memory; finished ones are pruned after ``job_retention_seconds``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised by :meth:`JobManager.submit` when the queue is at capacity."""
+
+
+@dataclass
+class StageState:
+    status: str = "pending"  # pending | running | done | skipped | failed
+    started_at: float | None = None
+    finished_at: float | None = None
+    detail: str | None = None
+
+
+@dataclass
+class Job:
+    """Status record and event log for one pipeline run.
+
+    The pipeline reports progress through the ``*_stage`` methods and
+    :meth:`emit`; every call appends to ``events`` and wakes SSE subscribers.
+    ``emit`` is safe to call from executor threads.  Route handlers that run
+    a pipeline synchronously create a throwaway Job so the same code path is
+    used either way.
+    """
+
+    job_id: str
+    kind: str
+    stages: dict[str, StageState] = field(default_factory=dict)
+    status: str = "queued"  # queued | running | succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    events: list[dict] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _listeners: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = field(
+        default_factory=list, repr=False,
+    )
+
+    @classmethod
+    def create(cls, job_id: str, kind: str, stage_names: Iterable[str]) -> "Job":
+        return cls(job_id=job_id, kind=kind, stages={n: StageState() for n in stage_names})
+
+    # ── events ─────────────────────────────────────────────────────────────
+    def emit(self, event: str, **data: Any) -> None:
+        """Append an event (JSON-serialisable *data*) and notify subscribers."""
+        with self._lock:
+            record = {"id": len(self.events), "event": event, "time": time.time(), "data": data}
+            self.events.append(record)
+            for loop, queue in self._listeners:
+                loop.call_soon_threadsafe(queue.put_nowait, record)
+
+    async def subscribe(self, after_id: int = -1) -> AsyncIterator[dict]:
+        """Yield events with ``id > after_id``: the backlog first, then live ones.
+
+        Stops after the ``completed`` event.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        listener = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            backlog = [e for e in self.events if e["id"] > after_id]
+            finished = bool(self.events) and self.events[-1]["event"] == "completed"
+            self._listeners.append(listener)
+        try:
+            for record in backlog:
+                yield record
+                if record["event"] == "completed":
+                    return
+            if finished:
+                return
+            while True:
+                record = await queue.get()
+                if record["id"] <= after_id:
+                    continue
+                yield record
+                if record["event"] == "completed":
+                    return
+        finally:
+            with self._lock:
+                self._listeners.remove(listener)
+
+    # ── stage bookkeeping ──────────────────────────────────────────────────
+    def start_stage(self, name: str) -> None:
+        stage = self.stages.setdefault(name, StageState())
+        stage.status = "running"
+        stage.started_at = time.time()
+        self.emit("stage_started", stage=name)
+
+    def finish_stage(self, name: str, detail: str | None = None, partial: Any = None) -> None:
+        """Mark *name* done; *partial* (the stage output) is pushed to subscribers."""
+        stage = self.stages.setdefault(name, StageState())
+        stage.status = "done"
+        stage.finished_at = time.time()
+        stage.detail = detail
+        self.emit("stage_finished", stage=name, detail=detail, partial=partial)
+
+    def skip_stage(self, name: str, detail: str | None = None) -> None:
+        stage = self.stages.setdefault(name, StageState())
+        stage.status = "skipped"
+        stage.finished_at = time.time()
+        stage.detail = detail
+        self.emit("stage_skipped", stage=name, detail=detail)
+
+    def _fail_running_stages(self, detail: str) -> None:
+        for name, stage in self.stages.items():
+            if stage.status == "running":
+                stage.status = "failed"
+                stage.finished_at = time.time()
+                stage.detail = detail
+                self.emit("stage_failed", stage=name, detail=detail)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+JobWork = Callable[[Job], Awaitable[Any]]
+
+
+class JobManager:
+    """Bounded pool of worker coroutines that run submitted jobs."""
+
+    def __init__(
+        self,
+        max_concurrent_jobs: int,
+        stage_threads: int,
+        max_queued_jobs: int,
+        retention_seconds: int,
+    ) -> None:
+        self.executor: ThreadPoolExecutor | None = None
+        self._stage_threads = stage_threads
+        self._max_concurrent = max_concurrent_jobs
+        self._max_queued = max_queued_jobs
+        self._retention = retention_seconds
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+
+    # ── lifecycle ──────────────────────────────────────────────────────────
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self.executor = ThreadPoolExecutor(
+            max_workers=self._stage_threads, thread_name_prefix="job-stage",
+        )
+        self._queue = asyncio.Queue(maxsize=self._max_queued)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self._max_concurrent)
+        ]
+        logger.info("Job manager started: %d workers", self._max_concurrent)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    # ── public API ─────────────────────────────────────────────────────────
+    async def submit(
+        self,
+        job: Job,
+        work: JobWork,
+        cleanup: Callable[[], None] | None = None,
+    ) -> Job:
+        """Queue *work* for *job*.  *cleanup* runs after the job finishes either way.
+
+        Raises JobQueueFullError when ``max_queued_jobs`` are already waiting.
+        """
+        await self.start()
+        self._prune()
+        try:
+            self._queue.put_nowait((job, work, cleanup))
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Too many queued jobs — try again later.") from None
+        self._jobs[job.job_id] = job
+        logger.info("[%s] Job queued: %s", job.job_id, job.kind)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    # ── internals ──────────────────────────────────────────────────────────
+    async def _worker(self, index: int) -> None:
+        while True:
+            job, work, cleanup = await self._queue.get()
+            try:
+                await self._run(job, work)
+            finally:
+                if cleanup is not None:
+                    try:
+                        cleanup()
+                    except Exception as exc:
+                        logger.warning("[%s] Job cleanup failed: %s", job.job_id, exc)
+                self._queue.task_done()
+
+    async def _run(self, job: Job, work: JobWork) -> None:
+        job.status = "running"
+        logger.info("[%s] Job started", job.job_id)
+        try:
+            job.result = await work(job)
+            job.status = "succeeded"
+            logger.info("[%s] Job succeeded", job.job_id)
+        except asyncio.CancelledError:
+            job.error = "Job cancelled."
+            job.status = "failed"
+            job._fail_running_stages(job.error)
+            raise
+        except Exception as exc:
+            job.error = str(exc) or exc.__class__.__name__
+            job.status = "failed"
+            job._fail_running_stages(job.error)
+            logger.error("[%s] Job failed: %s", job.job_id, exc)
+        finally:
+            job.finished_at = time.time()
+            result = job.result.model_dump() if hasattr(job.result, "model_dump") else job.result
+            job.emit("completed", status=job.status, error=job.error, result=result)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self._retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+@lru_cache
+def get_job_manager() -> JobManager:
+    settings = get_settings()
+    return JobManager(
+        max_concurrent_jobs=settings.max_concurrent_jobs,
+        stage_threads=settings.job_stage_threads,
+        max_queued_jobs=settings.max_queued_jobs,
+        retention_seconds=settings.job_retention_seconds,
+    )
@@ -0,0 +1,119 @@
+"""Keyframe-sampling input mode for body-language analysis.
+
+Instead of uploading the full video through the File API (hundreds of MB
+and a long PROCESSING wait for a lesson), each request carries frames
+sampled locally with ffmpeg at a low rate and resolution, inline as JPEG
+images, each preceded by its timestamp.  Per segment that is roughly a
+megabyte, and nothing has to be processed server-side before the first
+request can start.
+
+Inline data counts against Gemini's request size limit, so long windows
+(merged calm stretches, batched groups) are thinned with
+:func:`thin_keyframes` to a lower effective rate until they fit.
+"""
+from __future__ import annotations
+
+import base64
+import math
+import subprocess
+from dataclasses import dataclass
+
+from app.services.audio_utils import get_ffmpeg_bin
+
+# End-of-image immediately followed by the next start-of-image.
+_FRAME_BOUNDARY = b"\xff\xd9\xff\xd8"
+
+KEYFRAME_PREAMBLE = (
+    "The images below are frames sampled from a teaching video every {interval:g} seconds. "
+    "Each frame is preceded by its timestamp in the video. Treat them as the video itself.\n\n"
+)
+
+
+@dataclass(frozen=True)
+class KeyframeSampling:
+    """How frames are sampled; part of checkpoint and cache keys."""
+    fps: float = 0.5
+    width: int = 384
+    # ffmpeg mjpeg quality scale, 2 (best) – 31 (smallest)
+    quality: int = 5
+
+    @property
+    def signature(self) -> str:
+        return f"keyframes:{self.fps:g}:{self.width}:{self.quality}"
+
+
+def extract_keyframes(
+    video_path: str,
+    start_sec: int,
+    end_sec: int,
+    sampling: KeyframeSampling,
+) -> list[tuple[float, bytes]]:
+    """Return ``(timestamp, jpeg_bytes)`` frames of ``[start_sec, end_sec)``.
+
+    Raises RuntimeError if ffmpeg fails or yields no frames.
+    """
+    result = subprocess.run(
+        [
+            get_ffmpeg_bin(), "-hide_banner", "-nostats", "-v", "error",
+            "-ss", str(start_sec), "-t", str(end_sec - start_sec),
+            "-an", "-sn", "-dn", "-i", video_path,
+            "-vf", f"fps={sampling.fps:g},scale='min({sampling.width},iw)':-2",
+            "-c:v", "mjpeg", "-q:v", str(sampling.quality),
+            "-f", "image2pipe", "-",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg keyframe extraction failed: {stderr[:300]}")
+
+    data = result.stdout
+    if not data:
+        raise RuntimeError(f"No frames extracted between {start_sec}s and {end_sec}s")
+    frames: list[bytes] = []
+    begin = 0
+    pos = data.find(_FRAME_BOUNDARY)
+    while pos != -1:
+        frames.append(data[begin:pos + 2])
+        begin = pos + 2
+        pos = data.find(_FRAME_BOUNDARY, begin)
+    frames.append(data[begin:])
+    return [(start_sec + i / sampling.fps, jpeg) for i, jpeg in enumerate(frames)]
+
+
+def encoded_size(frames: list[tuple[float, bytes]]) -> int:
+    """Bytes the *frames* take inline, base64-encoded."""
+    return sum(4 * math.ceil(len(jpeg) / 3) for _, jpeg in frames)
+
+
+def thin_keyframes(
+    frames: list[tuple[float, bytes]], max_bytes: int,
+) -> tuple[list[tuple[float, bytes]], int]:
+    """Keep every *step*-th frame so the inline payload fits *max_bytes*.
+
+    Returns ``(frames, step)``; *step* is 1 if nothing had to be dropped.
+    Raises RuntimeError if not even a single frame fits.
+    """
+    step = 1
+    while encoded_size(frames[::step]) > max_bytes:
+        if step >= len(frames):
+            raise RuntimeError(
+                f"A single keyframe exceeds the {max_bytes / 1e6:.1f} MB inline limit"
+            )
+        step += 1
+    return frames[::step], step
+
+
+def keyframe_parts(frames: list[tuple[float, bytes]]) -> list[dict]:
+    """Gemini content parts: a timestamp label, then the inline JPEG, per frame."""
+    parts: list[dict] = []
+    for timestamp, jpeg in frames:
+        minutes, seconds = divmod(int(timestamp), 60)
+        parts.append({"text": f"[{minutes:02d}:{seconds:02d}]"})
+        parts.append({
+            "inline_data": {
+                "mime_type": "image/jpeg",
+                "data": base64.b64encode(jpeg).decode("ascii"),
+            },
+        })
+    return parts
@@ -6,10 +6,13 @@ evaluation — and generates actionable, personalized feedback for the teacher.
 from __future__ import annotations
 
 import logging
+import time
+from functools import lru_cache
 
 import anthropic
 
 from app.config import Settings
+from app.services.http_client import provider_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -62,28 +65,38 @@ End with a genuine, specific note of encouragement based on what was observed.
 """
 
 
+@lru_cache
+def _async_client(api_key: str, base_url: str) -> anthropic.AsyncAnthropic:
+    return anthropic.AsyncAnthropic(api_key=api_key, base_url=base_url)
+
+
 class MinimaxFeedbackService:
-    """Generates teacher feedback using Minimax via the Anthropic SDK."""
+    """Generates teacher feedback using Minimax via the Anthropic SDK.
+
+    :meth:`generate_feedback_async` uses a process-wide ``AsyncAnthropic``
+    (one connection pool), so routes can await it without holding a thread.
+    """
 
     def __init__(self, settings: Settings) -> None:
         api_key = settings.minimax_api_key
         if not api_key:
             raise ValueError("MINIMAX_API_KEY is not configured.")
 
+        self._api_key = api_key
+        self._base_url = settings.minimax_base_url
         self._client = anthropic.Anthropic(
             api_key=api_key,
             base_url=settings.minimax_base_url,
         )
         self._model = settings.minimax_model
 
-    def generate_feedback(
+    def _build_request(
         self,
-        transcript: str | None = None,
-        body_language_report: str | None = None,
-        rubric_evaluation: str | None = None,
-        additional_context: str | None = None,
-    ) -> str:
-        """Generate teacher feedback from all available analysis data."""
+        transcript: str | None,
+        body_language_report: str | None,
+        rubric_evaluation: str | None,
+        additional_context: str | None,
+    ) -> dict:
         content_parts: list[str] = []
 
         if transcript:
@@ -119,14 +132,15 @@ class MinimaxFeedbackService:
             "Generating Minimax feedback: model=%s, input=%d chars",
             self._model, len(user_message),
         )
-
-        message = self._client.messages.create(
-            model=self._model,
-            max_tokens=8192,
-            system=FEEDBACK_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_message}],
-        )
-
+        return {
+            "model": self._model,
+            "max_tokens": 8192,
+            "system": FEEDBACK_SYSTEM_PROMPT,
+            "messages": [{"role": "user", "content": user_message}],
+        }
+
+    @staticmethod
+    def _feedback_text(message) -> str:
         feedback = "".join(
             block.text for block in message.content if block.type == "text"
         )
@@ -136,3 +150,39 @@ class MinimaxFeedbackService:
             len(feedback), message.stop_reason,
         )
         return feedback
+
+    def generate_feedback(
+        self,
+        transcript: str | None = None,
+        body_language_report: str | None = None,
+        rubric_evaluation: str | None = None,
+        additional_context: str | None = None,
+    ) -> str:
+        """Generate teacher feedback from all available analysis data."""
+        request = self._build_request(
+            transcript, body_language_report, rubric_evaluation, additional_context,
+        )
+        message = self._client.messages.create(**request)
+        return self._feedback_text(message)
+
+    async def generate_feedback_async(
+        self,
+        transcript: str | None = None,
+        body_language_report: str | None = None,
+        rubric_evaluation: str | None = None,
+        additional_context: str | None = None,
+    ) -> str:
+        """Async :meth:`generate_feedback`."""
+        request = self._build_request(
+            transcript, body_language_report, rubric_evaluation, additional_context,
+        )
+        client = _async_client(self._api_key, self._base_url)
+        metrics = provider_metrics("minimax")
+        started = time.monotonic()
+        try:
+            message = await client.messages.create(**request)
+        except anthropic.APIError:
+            metrics.record_call(time.monotonic() - started, ok=False)
+            raise
+        metrics.record_call(time.monotonic() - started, ok=True)
+        return self._feedback_text(message)
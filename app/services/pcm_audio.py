@@ -0,0 +1,90 @@
+"""Shared in-process PCM buffer for a job's audio.
+
+``extract_audio`` produces one mono 16 kHz 16-bit WAV per job.  Instead of
+every consumer re-reading (or, for librosa, re-decoding) that file, it is
+memory-mapped once (see ``app/services/wav_io.py``) into a
+:class:`PcmAudio` and handed around:
+
+* chunkers and STT senders take int16 views / ``memoryview`` slices of the
+  mapping — no copies, and only the pages actually sent are read;
+* voice analysis converts one window at a time to float32, so a two-hour
+  recording never needs a full-length float array.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.wav_io import memmap_wav
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PcmAudio:
+    """Mono 16-bit PCM samples plus the metadata needed to slice them."""
+
+    samples: np.ndarray  # int16, shape (n,) — usually a read-only memmap
+    sample_rate: int
+    path: str | None = None
+
+    @classmethod
+    def from_wav(cls, path: str) -> "PcmAudio":
+        """Map a 16-bit PCM WAV; multi-channel input is down-mixed into memory."""
+        samples, info = memmap_wav(path)
+        if info.channels > 1:
+            samples = samples.mean(axis=1).astype(np.int16)
+        logger.debug("Mapped PCM: %s (%.1fs @ %d Hz)", path, info.duration, info.sample_rate)
+        return cls(samples=samples, sample_rate=info.sample_rate, path=path)
+
+    # ── geometry ───────────────────────────────────────────────────────────
+    @property
+    def num_samples(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        return self.num_samples / float(self.sample_rate) if self.sample_rate else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    def _index(self, seconds: float | None, default: int) -> int:
+        if seconds is None:
+            return default
+        return max(0, min(self.num_samples, int(round(seconds * self.sample_rate))))
+
+    # ── views ──────────────────────────────────────────────────────────────
+    def view(self, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """int16 samples between *start* and *end* seconds (a view, not a copy)."""
+        return self.samples[self._index(start, 0):self._index(end, self.num_samples)]
+
+    def float_window(self, start: float | None = None, end: float | None = None) -> np.ndarray:
+        """float32 samples in [-1, 1) between *start* and *end* seconds.
+
+        Converts only the requested range; keep windows short for long audio.
+        """
+        return self.view(start, end).astype(np.float32) / 32768.0
+
+    def pcm_bytes(self, start: float | None = None, end: float | None = None) -> memoryview:
+        """Raw little-endian PCM bytes of a range, as a zero-copy memoryview."""
+        return memoryview(self.view(start, end)).cast("B")
+
+    def write_wav(self, dest, start: float | None = None, end: float | None = None) -> None:
+        """Write a range as a mono 16-bit WAV to *dest* (path or binary file)."""
+        with wave.open(dest, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(self.sample_rate)
+            out.writeframes(self.pcm_bytes(start, end))
+
+    def wav_bytes(self, start: float | None = None, end: float | None = None) -> bytes:
+        """A range encoded as an in-memory WAV file (for multipart uploads)."""
+        buf = io.BytesIO()
+        self.write_wav(buf, start, end)
+        return buf.getvalue()
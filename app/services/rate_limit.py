@@ -0,0 +1,87 @@
+"""AIMD concurrency limiter for rate-limited provider APIs.
+
+Additive increase / multiplicative decrease, as in TCP congestion control:
+every successful call nudges the allowed concurrency up by ``1 / limit``
+(about +1 per "round" of calls), and a rate-limit response halves it.
+Rate-limit responses from calls that were already in flight when the limit
+was last cut do not cut it again, so one burst of 429s halves it once.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Slot:
+    """A held concurrency slot; remembers the limit epoch it was taken in."""
+    epoch: int
+
+
+class AimdLimiter:
+    """Caps concurrent calls at an adaptive limit in ``[minimum, maximum]``."""
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 8,
+        decrease_factor: float = 0.5,
+    ) -> None:
+        self.name = name
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._decrease_factor = decrease_factor
+        self._in_flight = 0
+        self._epoch = 0
+        self._cond: asyncio.Condition | None = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so the limiter can be built outside a running loop.
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Slot]:
+        """Hold one slot for the duration of a call."""
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+            held = Slot(self._epoch)
+        try:
+            yield held
+        finally:
+            async with cond:
+                self._in_flight -= 1
+                cond.notify_all()
+
+    def on_success(self, held: Slot) -> None:
+        before = self.limit
+        self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+        # Waiters re-check the limit when this slot is released.
+        if self.limit > before:
+            logger.info("%s concurrency raised to %d", self.name, self.limit)
+
+    def on_rate_limited(self, held: Slot) -> None:
+        if held.epoch != self._epoch:
+            return  # already cut for this burst
+        self._epoch += 1
+        self._limit = max(float(self.minimum), self._limit * self._decrease_factor)
+        logger.warning("%s rate-limited — concurrency cut to %d", self.name, self.limit)
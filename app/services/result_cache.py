@@ -0,0 +1,146 @@
+"""Content-addressed cache for pipeline stage outputs.
+
+Teachers often re-submit the same recording.  Every stage output
+(transcript, body-language summary, rubric text) is stored as a small JSON
+file keyed by the SHA-256 of the uploaded media plus everything else that
+influences the result — language, model and prompt version — so a repeat
+request skips the external providers entirely.
+
+Entries live under ``result_cache_dir`` and are evicted least-recently-used
+once the total size exceeds ``result_cache_max_bytes``.  Recency is kept in
+the file mtime, so the LRU order survives restarts.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(media_hash: str, stage: str, **params: Any) -> str:
+    """Return a stable cache key for *stage* of the media identified by *media_hash*.
+
+    *params* must contain every input that changes the stage output
+    (language, model, prompt version, ...).
+    """
+    material = json.dumps(
+        {"media": media_hash, "stage": stage, **params},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def text_hash(*parts: str | None) -> str:
+    """Short fingerprint of free text (prompts, transcripts) for use in keys."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a local file, read in chunks (same digest as the upload path)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Size-capped, LRU-evicted JSON store on local disk.  Thread-safe."""
+
+    def __init__(self, root: str, max_bytes: int) -> None:
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key → size in bytes, oldest first
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.json"
+
+    def _load_index(self) -> None:
+        entries = []
+        for path in self._root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path.stem, st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+        if entries:
+            logger.info(
+                "Result cache: %d entries, %.1f MB in %s",
+                len(entries), self._total / 1e6, self._root,
+            )
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for *key*, or None on a miss."""
+        with self._lock:
+            if key not in self._index:
+                return None
+            path = self._path(key)
+            try:
+                value = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._discard(key)
+                return None
+            self._index.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store *value* (JSON-serialisable) under *key* and evict if over the cap."""
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(data) > self._max_bytes:
+            return
+        path = self._path(key)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            if key in self._index:
+                self._total -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total += len(data)
+            while self._total > self._max_bytes and self._index:
+                self._discard(next(iter(self._index)))
+
+    def _discard(self, key: str) -> None:
+        self._total -= self._index.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+
+@lru_cache
+def get_result_cache() -> ResultCache | None:
+    """Return the process-wide cache, or None when caching is disabled."""
+    settings = get_settings()
+    if settings.result_cache_max_bytes <= 0:
+        return None
+    root = settings.result_cache_dir or str(Path(settings.temp_dir) / "hte_result_cache")
+    return ResultCache(root, settings.result_cache_max_bytes)
@@ -0,0 +1,254 @@
+"""Persistent store for completed analysis results (SQLite).
+
+Route handlers used to forget everything once the response was sent, so
+re-opening a report meant re-running the pipeline.  Every completed result
+(transcript, body-language summary, full analysis) is now written here as
+JSON, indexed by ``job_id``, media hash and creation time, and served back
+by ``/api/results`` and ``/api/jobs/{job_id}``.
+
+It also records Gemini File API uploads by media hash (``gemini_files``),
+so a video analysed twice is uploaded once, and checkpoints every finished
+body-language segment (``segment_checkpoints``) so a run with failed
+segments can be resumed without redoing the ones that succeeded.
+
+The database lives at ``result_store_path`` (default
+``<temp_dir>/hte_results.sqlite3``).  Each call opens its own connection, so
+the store is safe to use from route handlers and executor threads alike.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    job_id       TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    video_source TEXT,
+    media_hash   TEXT,
+    created_at   REAL NOT NULL,
+    payload      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_media_hash ON results (media_hash);
+CREATE INDEX IF NOT EXISTS idx_results_created_at ON results (created_at);
+CREATE TABLE IF NOT EXISTS gemini_files (
+    media_hash   TEXT NOT NULL,
+    account      TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    uri          TEXT NOT NULL,
+    state        TEXT NOT NULL,
+    expires_at   REAL,
+    updated_at   REAL NOT NULL,
+    PRIMARY KEY (media_hash, account)
+);
+CREATE TABLE IF NOT EXISTS segment_checkpoints (
+    media_hash   TEXT NOT NULL,
+    model        TEXT NOT NULL,
+    prompt       TEXT NOT NULL,
+    start_sec    INTEGER NOT NULL,
+    end_sec      INTEGER NOT NULL,
+    text         TEXT NOT NULL,
+    created_at   REAL NOT NULL,
+    PRIMARY KEY (media_hash, model, prompt, start_sec, end_sec)
+);
+"""
+
+
+@dataclass
+class StoredResult:
+    job_id: str
+    kind: str
+    video_source: str | None
+    media_hash: str | None
+    created_at: float
+    payload: dict | None = None
+
+
+@dataclass
+class GeminiFileRecord:
+    """A video uploaded to the Gemini File API.
+
+    ``account`` fingerprints the API key: uploaded files are only visible
+    to the project that uploaded them.
+    """
+    media_hash: str
+    account: str
+    name: str
+    uri: str
+    state: str
+    expires_at: float | None
+    updated_at: float = 0.0
+
+
+class ResultStore:
+    """Thin wrapper around a small SQLite database."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def save(
+        self,
+        job_id: str,
+        kind: str,
+        payload: Any,
+        video_source: str | None = None,
+        media_hash: str | None = None,
+    ) -> None:
+        """Insert or replace the result of *job_id*.  *payload* may be a pydantic model.
+
+        Storage errors are logged, not raised — a finished analysis must not
+        fail just because it could not be archived.
+        """
+        if hasattr(payload, "model_dump"):
+            payload = payload.model_dump()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "(job_id, kind, video_source, media_hash, created_at, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, video_source, media_hash, time.time(),
+                     json.dumps(payload, ensure_ascii=False)),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("[%s] Could not store %s result: %s", job_id, kind, exc)
+            return
+        logger.info("[%s] Stored %s result", job_id, kind)
+
+    def get(self, job_id: str) -> StoredResult | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM results WHERE job_id = ?", (job_id,),
+            ).fetchone()
+        return self._row_to_result(row, with_payload=True) if row else None
+
+    def list_results(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        kind: str | None = None,
+        media_hash: str | None = None,
+    ) -> list[StoredResult]:
+        """Return result headers (no payload), newest first."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if media_hash:
+            clauses.append("media_hash = ?")
+            params.append(media_hash)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job_id, kind, video_source, media_hash, created_at "
+                f"FROM results {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [self._row_to_result(r, with_payload=False) for r in rows]
+
+    # ── Gemini File API uploads ────────────────────────────────────────────
+    def get_gemini_file(self, media_hash: str, account: str) -> GeminiFileRecord | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM gemini_files WHERE media_hash = ? AND account = ?",
+                (media_hash, account),
+            ).fetchone()
+        return GeminiFileRecord(**dict(row)) if row else None
+
+    def save_gemini_file(self, record: GeminiFileRecord) -> None:
+        """Insert or replace *record*; errors are logged, not raised."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO gemini_files "
+                    "(media_hash, account, name, uri, state, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (record.media_hash, record.account, record.name, record.uri,
+                     record.state, record.expires_at, time.time()),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Could not record Gemini file %s: %s", record.name, exc)
+
+    def delete_gemini_file(self, media_hash: str, account: str) -> None:
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "DELETE FROM gemini_files WHERE media_hash = ? AND account = ?",
+                    (media_hash, account),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Could not forget Gemini file for %s: %s", media_hash[:12], exc)
+
+    # ── Body-language segment checkpoints ──────────────────────────────────
+    def get_segment_checkpoints(
+        self, media_hash: str, model: str, prompt: str,
+    ) -> dict[tuple[int, int], str]:
+        """Return ``{(start_sec, end_sec): text}`` of every checkpointed segment."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT start_sec, end_sec, text FROM segment_checkpoints "
+                "WHERE media_hash = ? AND model = ? AND prompt = ?",
+                (media_hash, model, prompt),
+            ).fetchall()
+        return {(r["start_sec"], r["end_sec"]): r["text"] for r in rows}
+
+    def save_segment_checkpoint(
+        self,
+        media_hash: str,
+        model: str,
+        prompt: str,
+        start_sec: int,
+        end_sec: int,
+        text: str,
+    ) -> None:
+        """Checkpoint one successful segment; errors are logged, not raised."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO segment_checkpoints "
+                    "(media_hash, model, prompt, start_sec, end_sec, text, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (media_hash, model, prompt, start_sec, end_sec, text, time.time()),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Could not checkpoint segment %d-%d of %s: %s",
+                           start_sec, end_sec, media_hash[:12], exc)
+
+    @staticmethod
+    def _row_to_result(row: sqlite3.Row, with_payload: bool) -> StoredResult:
+        return StoredResult(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            video_source=row["video_source"],
+            media_hash=row["media_hash"],
+            created_at=row["created_at"],
+            payload=json.loads(row["payload"]) if with_payload else None,
+        )
+
+
+@lru_cache
+def get_result_store() -> ResultStore:
+    settings = get_settings()
+    path = settings.result_store_path or str(Path(settings.temp_dir) / "hte_results.sqlite3")
+    return ResultStore(path)
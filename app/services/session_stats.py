@@ -15,11 +15,28 @@ class SessionStats:
     transcriptions: int = 0
     full_analyses: int = 0
     feedback_generated: int = 0
+    # Time spent waiting for Gemini to finish processing uploaded videos.
+    gemini_processing_waits: int = 0
+    gemini_processing_wait_seconds: float = 0.0
+    gemini_processing_wait_max_seconds: float = 0.0
 
     @property
     def uptime_seconds(self) -> int:
         return int(time.time() - self.started_at)
 
+    def record_gemini_processing_wait(self, seconds: float) -> None:
+        self.gemini_processing_waits += 1
+        self.gemini_processing_wait_seconds += seconds
+        self.gemini_processing_wait_max_seconds = max(
+            self.gemini_processing_wait_max_seconds, seconds,
+        )
+
+    @property
+    def gemini_processing_wait_avg_seconds(self) -> float:
+        if not self.gemini_processing_waits:
+            return 0.0
+        return self.gemini_processing_wait_seconds / self.gemini_processing_waits
+
 
 # Module-level singleton — imported directly by route handlers
 stats = SessionStats()
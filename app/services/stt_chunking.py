@@ -0,0 +1,287 @@
+"""Compressed, silence-aligned upload chunks for speech-to-text providers.
+
+Raw 16 kHz mono PCM is ~115 MB per hour, so a 23 MB Whisper chunk holds
+only ~12 minutes.  Here chunks are encoded (FLAC by default, or Opus) before
+upload and sized against the provider's byte limit:
+
+1. :func:`plan_chunks` places cut points using a conservative
+   bytes-per-second estimate for the codec, then moves each one back to the
+   quietest stretch nearby (a cheap RMS voice-activity pass over just the
+   search window) so words are not split.  Every chunk after the first also
+   starts ``overlap`` seconds early, in case no real pause was found.
+2. :func:`encode_chunk` encodes one chunk from the shared PCM buffer and,
+   should the result still exceed the limit, splits it at a pause and
+   tries again.
+3. :func:`stitch_segments` keeps each transcript segment only from the
+   chunk that owns its midpoint and drops near-duplicates left in the
+   overlap; :func:`reconcile_language` picks one language for the whole.
+
+The codec is chosen by ``stt_upload_codec`` (``flac`` | ``opus`` | ``wav``).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Protocol, TypeVar
+
+import numpy as np
+
+from app.services.audio_utils import encode_pcm, encoder_info
+from app.services.pcm_audio import PcmAudio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CODEC = "flac"
+
+# Conservative encoded size as a fraction of 16-bit PCM (FLAC on classroom
+# speech is usually ~0.5; Opus at 32 kbit/s is 0.125 of 16 kHz PCM).
+_SIZE_RATIO = {"flac": 0.75, "opus": 0.15, "wav": 1.0}
+# Never cut below this, even if a chunk keeps overshooting the limit.
+_MIN_CHUNK_SECONDS = 10.0
+# Chunks requested for parallelism are not made shorter than this.
+_MIN_PARALLEL_CHUNK_SECONDS = 60.0
+
+# Voice-activity pass: RMS over short frames, smoothed so that a pause (not
+# a single quiet frame inside a word) wins.
+_VAD_FRAME_SECONDS = 0.03
+_VAD_SMOOTH_FRAMES = 10
+_CUT_SEARCH_SECONDS = 15.0
+
+
+@dataclass
+class ChunkPlan:
+    """Audio range to send, and the part of it whose segments we keep.
+
+    ``[start, end)`` includes the overlap; ``[keep_start, keep_end)`` tiles
+    the recording without gaps or overlap across all chunks.
+    """
+
+    start: float
+    end: float
+    keep_start: float
+    keep_end: float
+
+    @classmethod
+    def whole(cls, audio: PcmAudio) -> "ChunkPlan":
+        return cls(0.0, audio.duration, 0.0, audio.duration)
+
+
+@dataclass
+class EncodedChunk:
+    """One upload-ready chunk and the audio range it covers."""
+
+    index: int
+    plan: ChunkPlan
+    data: bytes
+    filename: str
+    content_type: str
+
+    @property
+    def start(self) -> float:
+        return self.plan.start
+
+    @property
+    def end(self) -> float:
+        return self.plan.end
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Boundary planning
+# ─────────────────────────────────────────────────────────────────────────────
+
+def find_quiet_point(audio: PcmAudio, lo: float, hi: float) -> float:
+    """Return the centre of the quietest ~0.3 s stretch in ``[lo, hi]`` seconds.
+
+    Only the samples in the window are read; falls back to *hi* when the
+    window is too short to analyse.
+    """
+    window = audio.view(lo, hi)
+    frame = max(1, int(_VAD_FRAME_SECONDS * audio.sample_rate))
+    n_frames = len(window) // frame
+    if n_frames < _VAD_SMOOTH_FRAMES:
+        return hi
+    frames = np.asarray(window[: n_frames * frame], dtype=np.float32).reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    smoothed = np.convolve(rms, np.ones(_VAD_SMOOTH_FRAMES) / _VAD_SMOOTH_FRAMES, mode="valid")
+    best = int(np.argmin(smoothed)) + _VAD_SMOOTH_FRAMES // 2
+    return lo + (best + 0.5) * frame / audio.sample_rate
+
+
+def plan_chunks(
+    audio: PcmAudio,
+    codec: str,
+    max_bytes: int,
+    overlap: float = 0.0,
+    min_chunks: int = 1,
+    max_seconds: float | None = None,
+) -> list[ChunkPlan]:
+    """Plan chunks expected to encode under *max_bytes*, cut at pauses.
+
+    *min_chunks* asks for at least that many chunks (for parallel upload)
+    as long as each stays over a minute long.  *max_seconds* additionally
+    caps each chunk's length (for providers whose limit is time, not size).
+    """
+    encoder_info(codec)
+    pcm_bytes_per_sec = audio.sample_rate * audio.samples.itemsize
+    est_bytes_per_sec = pcm_bytes_per_sec * _SIZE_RATIO.get(codec, 1.0)
+    # Leave room for container headers, codec variance and the overlap.
+    chunk_seconds = max(_MIN_CHUNK_SECONDS, 0.95 * max_bytes / est_bytes_per_sec - overlap)
+    if max_seconds:
+        chunk_seconds = min(chunk_seconds, max(_MIN_CHUNK_SECONDS, max_seconds))
+
+    duration = audio.duration
+    if min_chunks > 1:
+        parallel_seconds = max(_MIN_PARALLEL_CHUNK_SECONDS, duration / min_chunks)
+        chunk_seconds = min(chunk_seconds, parallel_seconds)
+    if duration <= chunk_seconds:
+        return [ChunkPlan.whole(audio)]
+
+    # Even grid, then each cut slides back (at most `search`) to a pause.  A
+    # chunk can grow by one search window, so the grid leaves room for it.
+    n_chunks = math.ceil(duration / chunk_seconds)
+    while True:
+        step = duration / n_chunks
+        search = min(_CUT_SEARCH_SECONDS, step / 4)
+        if step + search <= chunk_seconds:
+            break
+        n_chunks += 1
+    cuts = [0.0]
+    for i in range(1, n_chunks):
+        nominal = i * step
+        cuts.append(find_quiet_point(audio, nominal - search, nominal))
+    cuts.append(duration)
+
+    plans = [
+        ChunkPlan(
+            start=max(0.0, keep_start - overlap) if i else 0.0,
+            end=keep_end,
+            keep_start=keep_start,
+            keep_end=keep_end,
+        )
+        for i, (keep_start, keep_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+    logger.debug("Planned %d chunks, cuts at %s", len(plans), [round(c, 2) for c in cuts])
+    return plans
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Encoding
+# ─────────────────────────────────────────────────────────────────────────────
+
+def encode_chunk(
+    audio: PcmAudio,
+    plan: ChunkPlan,
+    codec: str,
+    max_bytes: int,
+    index: int = 0,
+) -> list[EncodedChunk]:
+    """Encode *plan*'s range of *audio*; split it at a pause if it will not fit *max_bytes*.
+
+    Returns one chunk in the normal case, more if the estimate was too low.
+    Raises RuntimeError if even a minimum-length piece is too large.
+    """
+    ext, mime = encoder_info(codec)
+    if codec == "wav":
+        data = audio.wav_bytes(plan.start, plan.end)
+    else:
+        data = encode_pcm(audio.pcm_bytes(plan.start, plan.end), audio.sample_rate, codec)
+
+    if len(data) <= max_bytes:
+        logger.debug("Encoded %.1fs–%.1fs as %s: %.1f MB (%.0f%% of PCM)",
+                     plan.start, plan.end, codec, len(data) / 1e6,
+                     100 * len(data) / max(1, audio.pcm_bytes(plan.start, plan.end).nbytes))
+        return [EncodedChunk(index, plan, data, f"chunk_{index:04d}.{ext}", mime)]
+
+    if plan.keep_end - plan.keep_start <= _MIN_CHUNK_SECONDS:
+        raise RuntimeError(
+            f"Encoded audio chunk is {len(data) / 1e6:.1f} MB, above the "
+            f"{max_bytes / 1e6:.1f} MB provider limit."
+        )
+    logger.info("Chunk %.1fs–%.1fs encoded to %.1f MB (> %.1f MB) — splitting",
+                plan.start, plan.end, len(data) / 1e6, max_bytes / 1e6)
+    mid = (plan.keep_start + plan.keep_end) / 2
+    search = min(_CUT_SEARCH_SECONDS, (plan.keep_end - plan.keep_start) / 4)
+    cut = find_quiet_point(audio, mid - search, mid + search)
+    first = encode_chunk(
+        audio, ChunkPlan(plan.start, cut, plan.keep_start, cut), codec, max_bytes, index,
+    )
+    second = encode_chunk(
+        audio, ChunkPlan(cut, plan.end, cut, plan.keep_end), codec, max_bytes,
+        index + len(first),
+    )
+    return first + second
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Stitching
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _TimedText(Protocol):
+    start: float
+    end: float
+    text: str
+
+
+S = TypeVar("S", bound=_TimedText)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _same_text(a: str, b: str) -> bool:
+    wa, wb = _WORD_RE.findall(a.lower()), _WORD_RE.findall(b.lower())
+    if not wa or not wb:
+        return False
+    short, long_ = (wa, wb) if len(wa) <= len(wb) else (wb, wa)
+    return " ".join(short) in " ".join(long_)
+
+
+def stitch_segments(parts: list[tuple[ChunkPlan, list[S]]]) -> list[S]:
+    """Merge per-chunk segments (absolute times) into one ordered list.
+
+    A segment is kept only by the chunk whose keep range holds its
+    midpoint; a segment that still overlaps the previous one by more than
+    half its length with the same words (the overlap transcribed twice) is
+    dropped.
+    """
+    kept: list[S] = []
+    for i, (plan, segments) in enumerate(parts):
+        is_last = i == len(parts) - 1
+        for seg in segments:
+            mid = (seg.start + seg.end) / 2
+            # Provider timestamps can run slightly past the audio's end.
+            if plan.keep_start <= mid < plan.keep_end or (is_last and mid >= plan.keep_end):
+                kept.append(seg)
+    kept.sort(key=lambda s: (s.start, s.end))
+
+    result: list[S] = []
+    for seg in kept:
+        if result:
+            prev = result[-1]
+            shared = min(prev.end, seg.end) - max(prev.start, seg.start)
+            shortest = max(1e-3, min(prev.end - prev.start, seg.end - seg.start))
+            if shared / shortest > 0.5 and _same_text(prev.text, seg.text):
+                if len(seg.text) > len(prev.text):
+                    result[-1] = seg
+                continue
+        result.append(seg)
+    return result
+
+
+def reconcile_language(chunk_langs: list[tuple[str, float]]) -> str:
+    """Pick the language covering the most audio across chunks.
+
+    *chunk_langs* is ``(language, chunk_seconds)`` per chunk; chunks that
+    reported nothing are ignored.
+    """
+    weights: Counter[str] = Counter()
+    for lang, seconds in chunk_langs:
+        if lang and lang != "unknown":
+            weights[lang] += seconds
+    if not weights:
+        return "unknown"
+    if len(weights) > 1:
+        logger.info("Chunks disagree on language: %s", dict(weights))
+    return weights.most_common(1)[0][0]
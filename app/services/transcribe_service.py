@@ -24,9 +24,7 @@ import datetime
 import logging
 import os
 import socket
-import wave
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import List
 
 from amazon_transcribe.client import TranscribeStreamingClient
@@ -34,6 +32,7 @@ from amazon_transcribe.handlers import TranscriptResultStreamHandler
 from amazon_transcribe.model import TranscriptEvent
 
 from app.config import Settings
+from app.services.pcm_audio import PcmAudio
 
 logger = logging.getLogger(__name__)
 
@@ -205,14 +204,6 @@ def _resolve_language(language: str, fallback: str) -> str:
     return _LANG_MAP.get(language.lower(), fallback)
 
 
-def _wav_duration(path: str) -> float:
-    try:
-        with wave.open(path, "rb") as wf:
-            return wf.getnframes() / float(wf.getframerate())
-    except Exception:
-        return 0.0
-
-
 # ─────────────────────────────────────────────────────────────────────────────
 #  Public service class
 # ─────────────────────────────────────────────────────────────────────────────
@@ -230,19 +221,23 @@ class TranscribeService:
         if self._region:
             os.environ["AWS_DEFAULT_REGION"] = self._region
 
-    async def transcribe(self, audio_path: str, language: str = "auto") -> TranscribeResult:
-        """Stream *audio_path* (16 kHz mono WAV) to Amazon Transcribe.
+    async def transcribe(
+        self, audio: PcmAudio | str, language: str = "auto",
+    ) -> TranscribeResult:
+        """Stream *audio* (shared PCM buffer or 16 kHz mono WAV path) to Amazon Transcribe.
 
         Automatically detects and compensates for local clock skew so that
         AWS SigV4 signatures remain valid even if the Mac's system clock is
         drifted.
         """
         lang_code = _resolve_language(language, self._default_language)
-        duration = _wav_duration(audio_path)
+        if isinstance(audio, str):
+            audio = PcmAudio.from_wav(audio)
+        duration = audio.duration
 
         logger.info(
             "Starting Transcribe stream: path=%s, lang=%s, duration=%.1fs",
-            audio_path, lang_code, duration,
+            audio.path, lang_code, duration,
         )
 
         # ── Measure and compensate for clock skew ─────────────────────────
@@ -269,12 +264,13 @@ class TranscribeService:
             )
 
             async def _send_audio() -> None:
-                audio_bytes = Path(audio_path).read_bytes()
-                raw_pcm = audio_bytes[44:]  # skip standard 44-byte WAV header
+                # Walk a memoryview over the shared buffer instead of reading
+                # the file again; only each 16 KB event is materialised.
+                raw_pcm = audio.pcm_bytes()
 
                 for offset_bytes in range(0, len(raw_pcm), _CHUNK_SIZE):
                     chunk = raw_pcm[offset_bytes: offset_bytes + _CHUNK_SIZE]
-                    await stream.input_stream.send_audio_event(audio_chunk=chunk)
+                    await stream.input_stream.send_audio_event(audio_chunk=bytes(chunk))
 
                 await stream.input_stream.end_stream()
 
@@ -0,0 +1,142 @@
+"""Local motion-energy pre-pass for body-language segmentation.
+
+Fixed windows make a silent quiz or a long stretch of board writing cost
+as many Gemini calls as the most animated part of the lesson.  This module
+decodes the video once at 1 fps and 160 px wide, scores each second by the
+mean absolute luma difference to the previous sampled frame (scene cuts
+show up as spikes), and re-plans the fixed windows:
+
+* windows much calmer than the lesson average are merged with calm
+  neighbours, up to ``MAX_MERGED_WINDOWS`` windows per segment;
+* windows much busier than the average are split in half, so dense
+  stretches get a closer look.
+
+Scores are relative to the lesson itself, so the plan does not depend on
+camera, lighting or resolution.  Any ffmpeg failure falls back to the
+fixed windows.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import statistics
+import subprocess
+
+from app.services.audio_utils import get_ffmpeg_bin
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 160
+# A single scene cut must not make an otherwise still window look busy.
+_SCORE_CAP = 20.0
+# Windows below LOW x average are merged, above HIGH x average are split.
+LOW_ACTIVITY_RATIO = 0.5
+HIGH_ACTIVITY_RATIO = 2.5
+MAX_MERGED_WINDOWS = 3
+# Busy windows are not split below this length.
+MIN_SEGMENT_SECONDS = 60
+
+_FRAME_RE = re.compile(r"pts_time:([0-9.]+)")
+_SCORE_RE = re.compile(r"lavfi\.signalstats\.YAVG=([0-9.]+)")
+
+
+def fixed_segments(total_duration: int, segment_duration: int) -> list[tuple[int, int]]:
+    """Consecutive ``(start, end)`` windows of *segment_duration* seconds."""
+    spans: list[tuple[int, int]] = []
+    start = 0
+    while start < total_duration:
+        end = min(start + segment_duration, total_duration)
+        spans.append((start, end))
+        start = end
+    return spans
+
+
+def motion_profile(video_path: str) -> list[float]:
+    """Return one motion score per second of *video_path*.
+
+    ``profile[i]`` is the mean absolute luma difference (0-255) between the
+    frames sampled at seconds ``i`` and ``i + 1``.  Raises RuntimeError if
+    ffmpeg fails.
+    """
+    vf = (
+        f"fps=1,scale={SAMPLE_WIDTH}:-2,format=gray,"
+        "tblend=all_mode=difference,signalstats,"
+        "metadata=print:key=lavfi.signalstats.YAVG:file=-"
+    )
+    result = subprocess.run(
+        [
+            get_ffmpeg_bin(), "-hide_banner", "-nostats", "-v", "error",
+            "-an", "-sn", "-dn", "-i", video_path,
+            "-vf", vf, "-f", "null", "-",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg motion pass failed: {result.stderr.strip()[:300]}")
+
+    profile: list[float] = []
+    second = None
+    for line in result.stdout.splitlines():
+        if m := _FRAME_RE.search(line):
+            # tblend emits the difference at the later frame's timestamp.
+            second = max(0, round(float(m.group(1))) - 1)
+        elif (m := _SCORE_RE.search(line)) and second is not None:
+            if second >= len(profile):
+                profile.extend([0.0] * (second + 1 - len(profile)))
+            profile[second] = min(float(m.group(1)), _SCORE_CAP)
+    return profile
+
+
+def plan_segments(
+    profile: list[float],
+    total_duration: int,
+    segment_duration: int,
+) -> list[tuple[int, int]]:
+    """Re-plan the fixed windows of *segment_duration* from a motion *profile*."""
+    windows = fixed_segments(total_duration, segment_duration)
+    activity = [
+        statistics.fmean(profile[start:end]) if profile[start:end] else 0.0
+        for start, end in windows
+    ]
+    average = statistics.fmean(activity) if activity else 0.0
+    if average <= 0:
+        return windows
+
+    spans: list[tuple[int, int]] = []
+    merged = 0  # windows merged into spans[-1], 0 if it is not a calm run
+    for (start, end), level in zip(windows, activity):
+        if level <= LOW_ACTIVITY_RATIO * average:
+            if merged and merged < MAX_MERGED_WINDOWS:
+                spans[-1] = (spans[-1][0], end)
+                merged += 1
+            else:
+                spans.append((start, end))
+                merged = 1
+            continue
+        merged = 0
+        if level >= HIGH_ACTIVITY_RATIO * average and end - start >= 2 * MIN_SEGMENT_SECONDS:
+            mid = start + (end - start) // 2
+            spans.extend([(start, mid), (mid, end)])
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def plan_adaptive_segments(
+    video_path: str,
+    total_duration: int,
+    segment_duration: int,
+) -> list[tuple[int, int]]:
+    """Activity-adaptive segments for *video_path*; fixed windows if the pass fails."""
+    try:
+        profile = motion_profile(video_path)
+    except (RuntimeError, OSError) as exc:
+        logger.warning("Motion pass failed, using fixed segments: %s", exc)
+        return fixed_segments(total_duration, segment_duration)
+    spans = plan_segments(profile, total_duration, segment_duration)
+    logger.info(
+        "Adaptive segmentation: %d segments instead of %d",
+        len(spans), len(fixed_segments(total_duration, segment_duration)),
+    )
+    return spans
@@ -38,6 +38,8 @@ import math
 import librosa
 import numpy as np
 
+from app.services.pcm_audio import PcmAudio
+
 logger = logging.getLogger(__name__)
 
 # Human speech typically falls in the 65-600 Hz range.
@@ -115,7 +117,7 @@ def _compute_cv_energy(y: np.ndarray) -> float:
 
 
 def calculate_fluctuation_timeline(
-    wav_path: str,
+    audio: PcmAudio | str,
     window_sec: int = 180,
     sr: int = 16000,
 ) -> list[dict]:
@@ -123,30 +125,30 @@ def calculate_fluctuation_timeline(
 
     Parameters
     ----------
-    wav_path   : path to a mono WAV file
+    audio      : the job's shared :class:`PcmAudio`, or a path to a mono WAV
     window_sec : window length in seconds (default 180 = 3 minutes)
-    sr         : sample rate to load at
+    sr         : sample rate to analyse at
 
     Returns
     -------
     List of dicts with keys ``timestamp_start``, ``timestamp_end``, and
     ``fluctuation_score`` (0-100 normalised).
     """
-    y, sr = librosa.load(wav_path, sr=sr, mono=True)
-    total_samples = len(y)
-    window_samples = window_sec * sr
-    total_duration = total_samples / sr
+    if isinstance(audio, str):
+        audio = PcmAudio.from_wav(audio)
+    total_duration = audio.duration
 
     raw_scores: list[float] = []
     windows: list[tuple[float, float]] = []
 
-    offset = 0
-    while offset < total_samples:
-        end = min(offset + window_samples, total_samples)
-        chunk = y[offset:end]
-
-        t_start = offset / sr
-        t_end = end / sr
+    # Each window is converted to float on its own, straight from the shared
+    # (memory-mapped) buffer — no re-decode and no full-length float copy.
+    t_start = 0.0
+    while t_start < total_duration:
+        t_end = min(t_start + window_sec, total_duration)
+        chunk = audio.float_window(t_start, t_end)
+        if audio.sample_rate != sr:
+            chunk = librosa.resample(chunk, orig_sr=audio.sample_rate, target_sr=sr)
 
         cv_pitch = _compute_cv_pitch(chunk, sr)
         cv_energy = _compute_cv_energy(chunk)
@@ -156,7 +158,7 @@ def calculate_fluctuation_timeline(
         raw_scores.append(raw_score)
         windows.append((t_start, t_end))
 
-        offset = end
+        t_start = t_end
 
     # --- Normal-CDF normalisation to [0, 100] ---
     # Φ(z) = 0.5 * (1 + erf(z / √2))   where z = (S − μ) / σ
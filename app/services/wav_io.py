@@ -0,0 +1,110 @@
+"""WAV access layer: RIFF chunk parsing and memory-mapped sample access.
+
+Every service that needs WAV metadata or samples goes through here instead
+of ``wave.readframes`` on the whole file or assuming a 44-byte header
+(ffmpeg writes a ``LIST`` chunk before ``data``, so the samples usually
+start later than that).  :func:`read_wav_info` walks the RIFF chunks;
+:func:`memmap_wav` maps the ``data`` chunk with ``numpy.memmap`` so callers
+can slice hours of audio without reading it into memory.
+"""
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass(frozen=True)
+class WavInfo:
+    """Layout of a PCM WAV file's ``fmt `` and ``data`` chunks."""
+
+    path: str
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * (self.bits_per_sample // 8)
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.block_align if self.block_align else 0
+
+    @property
+    def duration(self) -> float:
+        return self.frames / float(self.sample_rate) if self.sample_rate else 0.0
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """Parse the RIFF chunks of *path*.  Raises ValueError for non-PCM or malformed files.
+
+    Unknown chunks (``LIST``, ``fact``, …) are skipped, odd-sized chunks
+    honour the RIFF pad byte, and a ``data`` size that runs past the end of
+    the file (ffmpeg writing to a pipe leaves 0xFFFFFFFF there) is clamped to
+    what is actually on disk.
+    """
+    file_size = os.path.getsize(path)
+    fmt: tuple[int, int, int, int] | None = None
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError(f"WAV file has no data chunk: {path}")
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            chunk_start = f.tell()
+
+            if chunk_id == b"fmt ":
+                body = f.read(min(chunk_size, 40))
+                if len(body) < 16:
+                    raise ValueError(f"Truncated fmt chunk: {path}")
+                format_tag, channels, rate, _byte_rate, _align, bits = struct.unpack(
+                    "<HHIIHH", body[:16],
+                )
+                if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (format_tag, channels, rate, bits)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"WAV data chunk precedes fmt chunk: {path}")
+                format_tag, channels, rate, bits = fmt
+                if format_tag != _WAVE_FORMAT_PCM:
+                    raise ValueError(f"Unsupported WAV format 0x{format_tag:04x}: {path}")
+                return WavInfo(
+                    path=path,
+                    sample_rate=rate,
+                    channels=channels,
+                    bits_per_sample=bits,
+                    data_offset=chunk_start,
+                    data_size=min(chunk_size, file_size - chunk_start),
+                )
+
+            f.seek(chunk_start + chunk_size + (chunk_size & 1))
+
+
+def memmap_wav(path: str) -> tuple[np.ndarray, WavInfo]:
+    """Map the samples of a 16-bit PCM WAV read-only.
+
+    Returns ``(samples, info)`` where *samples* has shape ``(frames,)`` for
+    mono files and ``(frames, channels)`` otherwise.  Slicing it touches only
+    the pages that are read.
+    """
+    info = read_wav_info(path)
+    if info.bits_per_sample != 16:
+        raise ValueError(f"Expected 16-bit PCM WAV, got {info.bits_per_sample}-bit: {path}")
+    shape = (info.frames,) if info.channels == 1 else (info.frames, info.channels)
+    if info.frames == 0:
+        return np.zeros(shape, dtype="<i2"), info  # mmap cannot map zero bytes
+    samples = np.memmap(path, dtype="<i2", mode="r", offset=info.data_offset, shape=shape)
+    return samples, info
@@ -5,25 +5,44 @@ WHY WE CHUNK
 ────────────
 Whisper API hard-limits each request to 25 MB.
 A 60-min mono 16kHz WAV is ~115 MB — way over the limit.
-We split the WAV into ≤23 MB chunks, transcribe each independently,
-then stitch text + timestamps back together.
+We cut the decoded PCM (one shared buffer) at pauses into slightly
+overlapping ranges, encode each as FLAC/Opus (``stt_upload_codec``) under
+23 MB, transcribe them independently, then stitch text + timestamps back
+together, dropping what the overlaps transcribed twice.
 
 SUPPORTED DURATION
 ──────────────────
-Unlimited in theory — each 23 MB chunk covers ≈12 minutes of audio.
-A 2-hour video → 10 chunks → 10 sequential Whisper calls.
+Unlimited in theory — a 23 MB chunk covers ≈16 minutes as FLAC or
+≈1.5 hours as Opus (≈12 minutes as raw WAV).  Chunks are sent
+``whisper_max_concurrency`` at a time (each retried with backoff), so
+latency drops roughly in proportion.
 """
 from __future__ import annotations
 
 import logging
-import math
-import os
-import wave
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import TYPE_CHECKING
 
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+
+from app.services.pcm_audio import PcmAudio
+from app.services.stt_chunking import (
+    ChunkPlan,
+    EncodedChunk,
+    encode_chunk,
+    plan_chunks,
+    reconcile_language,
+    stitch_segments,
+)
 
 if TYPE_CHECKING:
     from app.config import Settings
@@ -34,6 +53,11 @@ logger = logging.getLogger(__name__)
 _WHISPER_LIMIT = 25 * 1024 * 1024
 _SAFE_CHUNK_BYTES = 23 * 1024 * 1024  # 23 MB ≈ 12 min of 16kHz mono WAV
 
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_MAX_SECONDS = 30.0
+# Transient failures worth another attempt; anything else fails the request.
+_RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
 
 @dataclass
 class Segment:
@@ -53,54 +77,6 @@ class TranscriptResult:
 
 # ─────────────────────────── helpers ────────────────────────────────────────
 
-def _wav_duration(path: str) -> float:
-    """Return WAV duration in seconds without loading the whole file."""
-    with wave.open(path, "rb") as wf:
-        return wf.getnframes() / wf.getframerate()
-
-
-def _split_wav(wav_path: str, chunk_bytes: int, tmp_dir: str) -> list[tuple[str, float]]:
-    """Split a WAV file into chunks of ≤ chunk_bytes.
-
-    Returns list of (chunk_path, chunk_start_offset_seconds).
-    If the file fits in one chunk, returns a single-element list.
-    """
-    size = Path(wav_path).stat().st_size
-    if size <= chunk_bytes:
-        return [(wav_path, 0.0)]
-
-    with wave.open(wav_path, "rb") as wf:
-        n_channels = wf.getnchannels()
-        sampwidth = wf.getsampwidth()
-        framerate = wf.getframerate()
-        n_frames = wf.getnframes()
-        raw_data = wf.readframes(n_frames)
-
-    bytes_per_frame = n_channels * sampwidth
-    frames_per_chunk = chunk_bytes // bytes_per_frame
-    n_chunks = math.ceil(n_frames / frames_per_chunk)
-
-    chunks: list[tuple[str, float]] = []
-    for i in range(n_chunks):
-        start_frame = i * frames_per_chunk
-        end_frame = min(start_frame + frames_per_chunk, n_frames)
-        chunk_data = raw_data[start_frame * bytes_per_frame: end_frame * bytes_per_frame]
-        start_sec = start_frame / framerate
-
-        chunk_path = os.path.join(tmp_dir, f"chunk_{i:04d}.wav")
-        with wave.open(chunk_path, "wb") as out:
-            out.setnchannels(n_channels)
-            out.setsampwidth(sampwidth)
-            out.setframerate(framerate)
-            out.writeframes(chunk_data)
-
-        chunks.append((chunk_path, start_sec))
-        logger.debug("Chunk %d: %.1f s – %.1f s → %s", i,
-                     start_sec, end_frame / framerate, chunk_path)
-
-    return chunks
-
-
 def _to_srt_time(seconds: float) -> str:
     h = int(seconds // 3600)
     m = int((seconds % 3600) // 60)
@@ -133,35 +109,49 @@ class WhisperService:
             raise ValueError(
                 "OPENAI_API_KEY is not set in .env — Whisper transcription requires it."
             )
-        self._client = OpenAI(api_key=settings.openai_api_key)
+        # Retries are handled per chunk below, with our own backoff.
+        self._client = OpenAI(api_key=settings.openai_api_key, max_retries=0)
         self._model = settings.whisper_model
         self._chunk_bytes = settings.whisper_chunk_bytes
-
-    def transcribe(self, wav_path: str, language: str = "auto") -> TranscriptResult:
-        """Transcribe a WAV file (any length) and return structured results."""
-        tmp_dir = str(Path(wav_path).parent)
-        duration = _wav_duration(wav_path)
-        logger.info("Transcribing %.1f-second audio: %s", duration, wav_path)
-
-        chunks = _split_wav(wav_path, self._chunk_bytes, tmp_dir)
-        logger.info("Split into %d chunk(s)", len(chunks))
-
-        all_segments: list[Segment] = []
-        detected_language = "unknown"
+        self._codec = settings.stt_upload_codec
+        self._max_concurrency = max(1, settings.whisper_max_concurrency)
+        self._max_retries = settings.whisper_max_retries
+        self._overlap = settings.whisper_chunk_overlap_seconds
+
+    def transcribe(self, audio: PcmAudio | str, language: str = "auto") -> TranscriptResult:
+        """Transcribe audio (shared PCM buffer or WAV path, any length)."""
+        if isinstance(audio, str):
+            audio = PcmAudio.from_wav(audio)
+        duration = audio.duration
+        logger.info("Transcribing %.1f-second audio: %s", duration, audio.path)
+
+        # Ask for at least one chunk per worker so parallelism is used even
+        # when the whole recording would fit in a single request.
+        plans = plan_chunks(
+            audio, self._codec, self._chunk_bytes,
+            overlap=self._overlap, min_chunks=self._max_concurrency,
+        )
+        workers = min(self._max_concurrency, len(plans))
+        logger.info("Split into %d %s chunk(s), %d concurrent",
+                    len(plans), self._codec, workers)
 
         lang_kwarg: dict = {} if language == "auto" else {"language": language}
 
-        for chunk_path, offset_sec in chunks:
-            chunk_segs, lang = self._transcribe_chunk(chunk_path, offset_sec, lang_kwarg)
-            all_segments.extend(chunk_segs)
-            if lang:
-                detected_language = lang
-            # Clean up chunk (unless it's the original file)
-            if chunk_path != wav_path:
-                try:
-                    os.remove(chunk_path)
-                except OSError:
-                    pass
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="whisper") as pool:
+            futures = [
+                pool.submit(self._transcribe_range, audio, i, plan, lang_kwarg)
+                for i, plan in enumerate(plans)
+            ]
+            results = [piece for f in futures for piece in f.result()]
+
+        # Offsets are already absolute; stitching drops what the overlaps
+        # transcribed twice.
+        all_segments: list[Segment] = stitch_segments(
+            [(chunk.plan, chunk_segs) for chunk, chunk_segs, _lang in results]
+        )
+        detected_language = reconcile_language([
+            (lang, chunk.end - chunk.start) for chunk, _segs, lang in results
+        ])
 
         full_text = " ".join(s.text.strip() for s in all_segments)
         srt = _build_srt(all_segments)
@@ -174,20 +164,61 @@ class WhisperService:
             srt_content=srt,
         )
 
+    def _transcribe_range(
+        self,
+        audio: PcmAudio,
+        index: int,
+        plan: ChunkPlan,
+        lang_kwarg: dict,
+    ) -> list[tuple[EncodedChunk, list[Segment], str]]:
+        """Encode one planned chunk (split further if it overshoots) and transcribe it."""
+        pieces = encode_chunk(audio, plan, self._codec, self._chunk_bytes, index)
+        results = []
+        for chunk in pieces:
+            segments, lang = self._transcribe_chunk_with_retry(chunk, lang_kwarg)
+            results.append((chunk, segments, lang))
+        return results
+
+    def _transcribe_chunk_with_retry(
+        self,
+        chunk: EncodedChunk,
+        lang_kwarg: dict,
+    ) -> tuple[list[Segment], str]:
+        """Run :meth:`_transcribe_chunk`, retrying transient API errors.
+
+        Backoff is exponential with full jitter so parallel chunks that hit
+        a rate limit together do not retry in lock-step.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._transcribe_chunk(chunk, lang_kwarg)
+            except _RETRYABLE_ERRORS as exc:
+                if attempt >= self._max_retries:
+                    raise RuntimeError(
+                        f"Whisper chunk {chunk.index} failed after {attempt + 1} attempts: {exc}"
+                    ) from exc
+                delay = random.uniform(
+                    0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** attempt),
+                )
+                logger.warning("Whisper chunk %d failed (%s) — retry %d in %.1fs",
+                               chunk.index, exc.__class__.__name__, attempt + 1, delay)
+                time.sleep(delay)
+                attempt += 1
+
     def _transcribe_chunk(
         self,
-        chunk_path: str,
-        offset_sec: float,
+        chunk: EncodedChunk,
         lang_kwarg: dict,
     ) -> tuple[list[Segment], str]:
-        with open(chunk_path, "rb") as audio_file:
-            response = self._client.audio.transcriptions.create(
-                model=self._model,
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["segment"],
-                **lang_kwarg,
-            )
+        offset_sec, end_sec = chunk.start, chunk.end
+        response = self._client.audio.transcriptions.create(
+            model=self._model,
+            file=(chunk.filename, chunk.data, chunk.content_type),
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+            **lang_kwarg,
+        )
 
         detected_language: str = getattr(response, "language", "unknown") or "unknown"
         raw_segments = getattr(response, "segments", None) or []
@@ -204,10 +235,9 @@ class WhisperService:
         if not segments:
             text: str = getattr(response, "text", "") or ""
             if text.strip():
-                chunk_dur = _wav_duration(chunk_path) if Path(chunk_path).exists() else 0.0
                 segments.append(Segment(
                     start=round(offset_sec, 3),
-                    end=round(offset_sec + chunk_dur, 3),
+                    end=round(end_sec, 3),
                     text=text,
                 ))
 
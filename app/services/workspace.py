@@ -0,0 +1,226 @@
+"""Per-request scratch workspaces with a disk quota and a janitor.
+
+Every route that touches the disk (uploads, YouTube downloads, ffmpeg output,
+segment reports) gets its own directory from :class:`WorkspaceManager`
+instead of creating ``<temp_dir>/<prefix>_<job_id>`` by hand.  The manager
+
+* allocates directories under ``workspace_dir`` (default
+  ``<temp_dir>/hte_workspaces``) and tracks how many bytes each one holds —
+  the larger of its up-front reservation and its measured size;
+* applies back-pressure: :meth:`WorkspaceManager.acquire` waits up to
+  ``workspace_wait_seconds`` for room under ``workspace_quota_bytes`` and
+  then raises :class:`WorkspaceQuotaError` (routes answer 503);
+* runs a background janitor that re-measures live workspaces and deletes
+  abandoned ones — directories no live workspace owns (left behind by a
+  crash or restart) once they are older than ``workspace_max_age_seconds``.
+  Scratch dirs created directly in ``temp_dir`` by older releases
+  (``bl_<id>``, ``blyt_<id>``, …) are reclaimed the same way.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Scratch dirs older releases created straight in temp_dir.
+_LEGACY_DIR_RE = re.compile(r"^(vt|bl|blyt|hte|fa|fayt|yt|job|jobyt)_[0-9a-f]{32}$")
+
+_WAIT_POLL_SECONDS = 0.5
+
+# Up-front reservation for YouTube downloads, whose size is unknown until
+# yt-dlp finishes.  The janitor replaces it with the measured size.
+DOWNLOAD_RESERVE_BYTES = 512 * 1024 * 1024
+
+
+class WorkspaceQuotaError(Exception):
+    """Raised when no room frees up under the disk quota in time."""
+
+
+def dir_size(path: Path) -> int:
+    """Total size in bytes of the regular files below *path*."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+@dataclass
+class Workspace:
+    """A scratch directory owned by one request or job."""
+
+    name: str
+    path: Path
+    reserved_bytes: int = 0
+    used_bytes: int = 0
+    created_at: float = field(default_factory=time.time)
+    _manager: "WorkspaceManager | None" = field(default=None, repr=False)
+
+    @property
+    def charged_bytes(self) -> int:
+        """Bytes counted against the quota."""
+        return max(self.reserved_bytes, self.used_bytes)
+
+    def refresh(self) -> int:
+        """Re-measure the directory and return its size in bytes."""
+        self.used_bytes = dir_size(self.path)
+        return self.used_bytes
+
+    def settle(self) -> None:
+        """Drop the up-front reservation once the input is on disk."""
+        self.refresh()
+        self.reserved_bytes = 0
+
+    def release(self) -> None:
+        """Delete the directory and stop counting it.  Safe to call twice."""
+        if self._manager is not None:
+            self._manager.release(self)
+        else:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+
+class WorkspaceManager:
+    """Allocates scratch workspaces and keeps their total size under a quota."""
+
+    def __init__(
+        self,
+        root: str,
+        quota_bytes: int,
+        wait_seconds: float,
+        max_age_seconds: int,
+        janitor_interval_seconds: int,
+        legacy_root: str | None = None,
+    ) -> None:
+        self._root = Path(root)
+        self._quota = quota_bytes
+        self._wait = wait_seconds
+        self._max_age = max_age_seconds
+        self._interval = janitor_interval_seconds
+        self._legacy_root = Path(legacy_root) if legacy_root else None
+        self._live: dict[str, Workspace] = {}
+        self._lock = threading.Lock()
+        self._janitor: asyncio.Task | None = None
+
+    # ── accounting ─────────────────────────────────────────────────────────
+    def usage(self) -> int:
+        """Bytes currently charged to live workspaces."""
+        with self._lock:
+            return sum(ws.charged_bytes for ws in self._live.values())
+
+    def _try_register(self, ws: Workspace) -> bool:
+        with self._lock:
+            used = sum(w.charged_bytes for w in self._live.values())
+            # An empty manager always admits one workspace so that a single
+            # request larger than the quota cannot wait forever.
+            if self._quota > 0 and self._live and used + ws.charged_bytes > self._quota:
+                return False
+            self._live[ws.name] = ws
+            return True
+
+    # ── public API ─────────────────────────────────────────────────────────
+    async def acquire(self, prefix: str, job_id: str, reserve_bytes: int = 0) -> Workspace:
+        """Create ``<root>/<prefix>_<job_id>`` once *reserve_bytes* fit the quota.
+
+        Raises WorkspaceQuotaError after ``workspace_wait_seconds``.
+        """
+        name = f"{prefix}_{job_id}"
+        ws = Workspace(
+            name=name, path=self._root / name, reserved_bytes=reserve_bytes, _manager=self,
+        )
+        deadline = time.monotonic() + self._wait
+        while not self._try_register(ws):
+            if time.monotonic() >= deadline:
+                logger.warning("[%s] Workspace quota exhausted (%.1f MB in use)",
+                               job_id, self.usage() / 1e6)
+                raise WorkspaceQuotaError("Server is busy (disk quota reached) — try again later.")
+            await asyncio.sleep(_WAIT_POLL_SECONDS)
+        ws.path.mkdir(parents=True, exist_ok=True)
+        return ws
+
+    def release(self, ws: Workspace) -> None:
+        with self._lock:
+            self._live.pop(ws.name, None)
+        shutil.rmtree(ws.path, ignore_errors=True)
+
+    # ── janitor ────────────────────────────────────────────────────────────
+    def sweep(self) -> int:
+        """Re-measure live workspaces and delete abandoned ones.  Returns bytes freed."""
+        with self._lock:
+            live = list(self._live.values())
+        for ws in live:
+            ws.refresh()
+
+        live_paths = {ws.path for ws in live}
+        candidates: list[Path] = []
+        if self._root.is_dir():
+            candidates += [p for p in self._root.iterdir() if p.is_dir()]
+        if self._legacy_root is not None and self._legacy_root.is_dir():
+            candidates += [
+                p for p in self._legacy_root.iterdir()
+                if p.is_dir() and _LEGACY_DIR_RE.match(p.name)
+            ]
+
+        cutoff = time.time() - self._max_age
+        freed = 0
+        for path in candidates:
+            if path in live_paths:
+                continue
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+            except OSError:
+                continue
+            size = dir_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+            freed += size
+            logger.info("Janitor reclaimed %s (%.1f MB)", path, size / 1e6)
+        return freed
+
+    async def _janitor_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as exc:
+                logger.warning("Workspace janitor failed: %s", exc)
+            await asyncio.sleep(self._interval)
+
+    async def start(self) -> None:
+        if self._janitor is None:
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._janitor = asyncio.create_task(self._janitor_loop(), name="workspace-janitor")
+
+    async def stop(self) -> None:
+        if self._janitor is not None:
+            self._janitor.cancel()
+            await asyncio.gather(self._janitor, return_exceptions=True)
+            self._janitor = None
+
+
+@lru_cache
+def get_workspace_manager() -> WorkspaceManager:
+    settings = get_settings()
+    return WorkspaceManager(
+        root=settings.workspace_dir or str(Path(settings.temp_dir) / "hte_workspaces"),
+        quota_bytes=settings.workspace_quota_bytes,
+        wait_seconds=settings.workspace_wait_seconds,
+        max_age_seconds=settings.workspace_max_age_seconds,
+        janitor_interval_seconds=settings.workspace_janitor_interval_seconds,
+        legacy_root=settings.temp_dir,
+    )
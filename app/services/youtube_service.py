@@ -37,16 +37,17 @@ class YouTubeDownloader:
     def __init__(self, settings: "Settings") -> None:
         self._tmp_dir = settings.temp_dir
 
-    def download_audio(self, url: str, job_id: str) -> str:
+    def download_audio(self, url: str, job_id: str, out_dir: str | None = None) -> str:
         """Download audio from *url* and return the path to a WAV file.
 
-        The file is placed in a subdirectory of temp_dir named
-        ``yt_{job_id}/``.  Callers are responsible for cleanup.
+        The file is placed in *out_dir* (normally the caller's workspace),
+        or else in a subdirectory of temp_dir named ``yt_{job_id}/``.
+        Callers are responsible for cleanup.
         """
         if not is_valid_youtube_url(url):
             raise ValueError(f"Not a valid YouTube URL: {url}")
 
-        out_dir = Path(self._tmp_dir) / f"yt_{job_id}"
+        out_dir = Path(out_dir) if out_dir else Path(self._tmp_dir) / f"yt_{job_id}"
         out_dir.mkdir(parents=True, exist_ok=True)
 
         # yt-dlp saves to this template; %(ext)s will be replaced by the